@@ -3,101 +3,205 @@
 from __future__ import annotations
 
 from collections.abc import Callable
+from logging import getLogger
 
 import dearpygui.dearpygui as dpg  # type: ignore
 
 from .state import AppState
-from .services.analysis_service import DetectedMark, analyze_current_frame
+from .ui_helpers import update_status
+from .services.analysis_service import (
+    DetectedMarks,
+    frame_analysis_job,
+    submit_frame_analysis,
+)
 
 
-def draw_analysis_overlays(app_state: AppState, marks: list[DetectedMark]) -> None:
+logger = getLogger(__name__)
+
+BASE_POINT_TAG = "analysis_base_point"
+
+
+def draw_analysis_overlays(app_state: AppState, marks: DetectedMarks) -> None:
     """Draw overlay indicators on detected marks.
 
+    Overlay items are pooled: existing ones are moved with configure_item and
+    surplus ones hidden, new items are only created when the pool runs short.
+
     Args:
         app_state: The application state.
-        marks: List of detected marks to draw.
+        marks: Detected marks to draw.
     """
-    # Clear existing analysis overlays
-    for tag in app_state.analysis.overlay_tags:
-        if dpg.does_item_exist(tag):
-            dpg.delete_item(tag)
-    app_state.analysis.overlay_tags.clear()
-
-    # Draw each detected mark
-    if app_state.analysis.base_x is not None and app_state.analysis.base_y is not None:
+    analysis = app_state.analysis
+
+    if analysis.base_x is not None and analysis.base_y is not None:
         marker_size = 6
         half = marker_size // 2
-        tag = "analysis_base_point"
-        dpg.draw_rectangle(
-            pmin=(app_state.analysis.base_x - half, app_state.analysis.base_y - half),
-            pmax=(app_state.analysis.base_x + half, app_state.analysis.base_y + half),
-            color=(0, 255, 0, 255),
-            fill=(0, 255, 0, 50),
-            thickness=2,
-            tag=tag,
-            parent=app_state.ui.image_drawlist_tag,
-        )
-        app_state.analysis.overlay_tags.append(tag)
-
-    for i, mark in enumerate(marks):
-        tag = f"analysis_mark_{i}"
-
-        # Calculate ellipse bounding box for drawing
-        # DearPyGui doesn't have native ellipse drawing, so we'll use a circle
-        # approximation or draw as a rectangle outline
-        radius = max(mark.axis_a, mark.axis_b)
-
-        # Draw a circle around the detected mark
-        dpg.draw_circle(
-            center=(mark.center_x, mark.center_y),
-            radius=radius + 3,  # Slightly larger than the mark
-            color=(255, 0, 0, 255),
-            thickness=2,
-            tag=tag,
-            parent=app_state.ui.image_drawlist_tag,
-        )
-        app_state.analysis.overlay_tags.append(tag)
-
-
-def run_analysis(
-    app_state: AppState,
-    update_areas_list: Callable[[AppState], None] | None = None,
-) -> None:
-    """Run the full analysis pipeline.
+        pmin = (analysis.base_x - half, analysis.base_y - half)
+        pmax = (analysis.base_x + half, analysis.base_y + half)
+        if dpg.does_item_exist(BASE_POINT_TAG):
+            dpg.configure_item(BASE_POINT_TAG, pmin=pmin, pmax=pmax, show=True)
+        else:
+            dpg.draw_rectangle(
+                pmin=pmin,
+                pmax=pmax,
+                color=(0, 255, 0, 255),
+                fill=(0, 255, 0, 50),
+                thickness=2,
+                tag=BASE_POINT_TAG,
+                parent=app_state.ui.image_drawlist_tag,
+            )
+    elif dpg.does_item_exist(BASE_POINT_TAG):
+        dpg.hide_item(BASE_POINT_TAG)
+
+    # DearPyGui doesn't have native ellipse drawing, so we'll use a circle
+    # approximation
+    pool = analysis.overlay_tag_pool
+    for i, (center, radius) in enumerate(
+        zip(marks.centers_xy.tolist(), marks.radii().tolist())
+    ):
+        # Slightly larger than the mark
+        if i < len(pool):
+            dpg.configure_item(pool[i], center=center, radius=radius + 3, show=True)
+        else:
+            tag = f"analysis_mark_{i}"
+            dpg.draw_circle(
+                center=center,
+                radius=radius + 3,
+                color=(255, 0, 0, 255),
+                thickness=2,
+                tag=tag,
+                parent=app_state.ui.image_drawlist_tag,
+            )
+            pool.append(tag)
+
+    for tag in pool[len(marks) : analysis.overlay_shown_count]:
+        dpg.hide_item(tag)
+    analysis.overlay_shown_count = len(marks)
+
+
+def run_analysis(app_state: AppState) -> None:
+    """Run the full analysis pipeline and report the mark count when done.
 
     This is the main entry point for analysis. It:
     1. Detects colored marks in the current image
     2. Draws overlays on detected marks
     3. Counts marks per named area and updates the UI
 
+    The steps run like request_analysis; once apply_finished_analysis draws
+    the result, it also reports the mark count in the status bar.
+
     Args:
         app_state: The application state.
     """
-    # Clear previous analysis results
-    clear_analysis_overlays(app_state)
-    app_state.analysis.area_mark_counts.clear()
+    analysis = app_state.analysis
+    with analysis.analysis_lock:
+        analysis.analysis_report_status = True
+    request_analysis(app_state)
 
-    result = analyze_current_frame(app_state)
-    if result is None:
-        if update_areas_list is not None:
-            update_areas_list(app_state)
+
+def request_analysis(app_state: AppState) -> None:
+    """Start the analysis pipeline on the analysis worker thread.
+
+    The result is applied by apply_finished_analysis, which the main loop
+    calls every iteration. A request made while a run is in flight re-runs
+    the analysis on fresh inputs once that run finishes.
+
+    Args:
+        app_state: The application state.
+    """
+    analysis = app_state.analysis
+    # DPG callbacks run on their own thread, only the main loop applies results
+    with analysis.analysis_lock:
+        if analysis.analysis_future is not None:
+            analysis.analysis_stale = True
+            return
+        job = frame_analysis_job(app_state)
+        if job is None:
+            analysis.analysis_cleared = True
+        else:
+            analysis.analysis_cleared = False
+            analysis.analysis_future = submit_frame_analysis(job, analysis)
+
+
+def apply_finished_analysis(
+    app_state: AppState,
+    update_areas_list: Callable[[AppState], None] | None = None,
+) -> None:
+    """Draw the result of a finished request_analysis run, if there is one.
+
+    Args:
+        app_state: The application state.
+        update_areas_list: Called after the per-area mark counts change.
+    """
+    analysis = app_state.analysis
+    with analysis.analysis_lock:
+        future = analysis.analysis_future
+        if future is not None:
+            if not future.done():
+                return
+            analysis.analysis_future = None
+            stale = analysis.analysis_stale
+            analysis.analysis_stale = False
+        elif analysis.analysis_cleared:
+            stale = False
+        else:
+            return
+        analysis.analysis_cleared = False
+        report_status = not stale and analysis.analysis_report_status
+        if report_status:
+            analysis.analysis_report_status = False
+
+    if stale:
+        request_analysis(app_state)
         return
 
-    marks, counts = result
-    draw_analysis_overlays(app_state, marks)
-    app_state.analysis.area_mark_counts = counts
+    # This runs in the main loop, where an exception would close the app
+    result = None
+    if future is not None:
+        try:
+            result = future.result()
+        except Exception:
+            logger.exception("Frame analysis failed")
+    try:
+        _apply_analysis_result(app_state, result, update_areas_list)
+    except Exception:
+        logger.exception("Drawing the frame analysis result failed")
+
+    if report_status:
+        update_status(
+            app_state,
+            f"Analysis: found marks, {analysis.total_mark_count} in named areas",
+        )
+
+
+def _apply_analysis_result(
+    app_state: AppState,
+    result: tuple[DetectedMarks, dict[str, int]] | None,
+    update_areas_list: Callable[[AppState], None] | None,
+) -> None:
+    if result is None:
+        app_state.analysis.area_mark_counts.clear()
+        app_state.analysis.total_mark_count = 0
+        clear_analysis_overlays(app_state)
+    else:
+        marks, counts = result
+        draw_analysis_overlays(app_state, marks)
+        app_state.analysis.area_mark_counts = counts
+        app_state.analysis.total_mark_count = sum(counts.values())
 
     if update_areas_list is not None:
         update_areas_list(app_state)
 
 
 def clear_analysis_overlays(app_state: AppState) -> None:
-    """Clear all analysis overlays from the image.
+    """Hide all analysis overlays on the image.
 
     Args:
         app_state: The application state.
     """
-    for tag in app_state.analysis.overlay_tags:
-        if dpg.does_item_exist(tag):
-            dpg.delete_item(tag)
-    app_state.analysis.overlay_tags.clear()
+    if dpg.does_item_exist(BASE_POINT_TAG):
+        dpg.hide_item(BASE_POINT_TAG)
+    pool = app_state.analysis.overlay_tag_pool
+    for tag in pool[: app_state.analysis.overlay_shown_count]:
+        dpg.hide_item(tag)
+    app_state.analysis.overlay_shown_count = 0
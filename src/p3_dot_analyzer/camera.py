@@ -1,6 +1,7 @@
 from p3_camera import P3Camera, extract_thermal_data  # type: ignore
 from p3_viewer import ColormapID  # type: ignore
 from dataclasses import dataclass, field
+import os
 import queue
 import threading
 from numpy.typing import NDArray
@@ -8,11 +9,10 @@ import time
 
 from .render import render, RenderConfig
 import numpy as np
+import cv2
 from logging import getLogger
 from pathlib import Path
 from datetime import timedelta
-import struct
-import mmap
 from datetime import datetime
 
 logger = getLogger(__name__)
@@ -24,6 +24,15 @@ RENDER_SCALE = 2
 RENDER_WIDTH = CAMERA_WIDTH * RENDER_SCALE
 RENDER_HEIGHT = CAMERA_HEIGHT * RENDER_SCALE
 
+# Recorded data is not read back while recording, so every this many frames
+# the written pages are dropped from the OS page cache (where supported).
+RECORDER_FADVISE_FRAMES = 64
+# Frame records are collected into batches of this many and written at once
+RECORDER_BATCH_FRAMES = 16
+# A batch is written early once its first frame is this old, so slow record
+# periods don't hold frames in memory (and lose them on a crash)
+RECORDER_BATCH_MAX_AGE_S = 1.0
+
 # 2 bytes per pixel
 SAVED_FRAME_SIZE = 8 + (CAMERA_WIDTH * CAMERA_HEIGHT * 2)
 
@@ -66,15 +75,32 @@ class _RecorderFrame:
 
 class Recorder:
     def __init__(self, dest_path: Path, frame_period: timedelta) -> None:
-        self._frame_period_sec = frame_period.total_seconds()
-        self._last_frame_ts = 0.0
+        self._frame_period_ns = frame_period // timedelta(microseconds=1) * 1000
+        self._last_frame_ns = 0
         self._start_ts = time.monotonic()
+        # Only written by the recorder thread; stats() reads them unlocked
         self._frame_count = 0
+        self._bytes_written = 0
 
-        self._frames_queue = queue.Queue[_RecorderFrame](maxsize=2)
+        # Room for short write stalls without dropping frames (~1.5 MB)
+        self._frames_queue = queue.Queue[_RecorderFrame](maxsize=16)
 
         self._file = open(dest_path, "wb")
-        self._stats_lock = threading.Lock()
+
+        # Preformatted records (timestamp followed by the data) for a batch
+        # of frames, written out with a single ~1.5 MB write
+        self._batch = bytearray(RECORDER_BATCH_FRAMES * SAVED_FRAME_SIZE)
+        self._batch_frames = 0
+        self._batch_started = 0.0
+        self._unadvised_frames = 0
+        self._batch_ts = np.frombuffer(self._batch, dtype="<i8").reshape(
+            (RECORDER_BATCH_FRAMES, SAVED_FRAME_SIZE // 8)
+        )[:, 0]
+        self._batch_thermal = (
+            np.frombuffer(self._batch, dtype=np.uint16)
+            .reshape((RECORDER_BATCH_FRAMES, SAVED_FRAME_SIZE // 2))[:, 4:]
+            .reshape((RECORDER_BATCH_FRAMES, CAMERA_HEIGHT, CAMERA_WIDTH))
+        )
 
         self._thread = threading.Thread(target=self._thread_body)
         self._thread.start()
@@ -86,50 +112,91 @@ class Recorder:
         self._file.close()
 
     def on_frame(self, raw_thermal: NDArray[np.uint16]) -> None:
-        now = time.monotonic()
-        if now - self._last_frame_ts < self._frame_period_sec:
+        now = time.monotonic_ns()
+        if now - self._last_frame_ns < self._frame_period_ns:
             return
 
         try:
             self._frames_queue.put_nowait(_RecorderFrame(raw_thermal))
-            self._last_frame_ts = now
+            self._last_frame_ns = now
         except queue.Full:
             logger.warning("Recorder frames queue is full, dropping frame")
 
     def stats(self) -> CamEvRecordingStats:
-        with self._stats_lock:
-            return CamEvRecordingStats(
-                duration=timedelta(seconds=time.monotonic() - self._start_ts),
-                frame_count=self._frame_count,
-                file_size_bytes=self._file.tell(),
-            )
+        return CamEvRecordingStats(
+            duration=timedelta(seconds=time.monotonic() - self._start_ts),
+            frame_count=self._frame_count,
+            file_size_bytes=self._bytes_written,
+        )
 
     def _thread_body(self) -> None:
         while True:
+            timeout = None
+            if self._batch_frames:
+                batch_age = time.monotonic() - self._batch_started
+                timeout = max(0.0, RECORDER_BATCH_MAX_AGE_S - batch_age)
             try:
-                frame = self._frames_queue.get()
-
-                ts_data = struct.pack("<q", int(frame.ts * 1000))
-                data = frame.raw_thermal.tobytes("C")
-                del frame
-
-                with self._stats_lock:
-                    self._file.write(ts_data)
-                    self._file.write(data)
-                    self._frame_count += 1
-                del data
+                frame = self._frames_queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write_batch()
+                continue
             except queue.ShutDown:
                 break
 
+            idx = self._batch_frames
+            if idx == 0:
+                self._batch_started = time.monotonic()
+            self._batch_ts[idx] = int(frame.ts * 1000)
+            self._batch_thermal[idx] = frame.raw_thermal
+            del frame
+
+            self._batch_frames += 1
+            self._frame_count += 1
+
+            if (
+                self._batch_frames == RECORDER_BATCH_FRAMES
+                or time.monotonic() - self._batch_started >= RECORDER_BATCH_MAX_AGE_S
+            ):
+                self._write_batch()
+
+        # Frames still queued at stop() are drained before ShutDown is raised
+        self._write_batch()
+
+    def _write_batch(self) -> None:
+        size = self._batch_frames * SAVED_FRAME_SIZE
+        self._file.write(memoryview(self._batch)[:size])
+        self._bytes_written += size
+        self._unadvised_frames += self._batch_frames
+        self._batch_frames = 0
+        if self._unadvised_frames >= RECORDER_FADVISE_FRAMES:
+            self._unadvised_frames = 0
+            self._drop_written_pages()
+
+    def _drop_written_pages(self) -> None:
+        if not hasattr(os, "posix_fadvise"):
+            return
+        # The kernel skips dirty pages, so hand the buffered data to the kernel
+        # and wait for it to reach the disk first. This runs on the recorder
+        # thread, where waiting only delays the next batch.
+        self._file.flush()
+        os.fdatasync(self._file.fileno())
+        os.posix_fadvise(self._file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
 
 class RecordingReader:
     def __init__(self, path: Path) -> None:
-        self._file = open(path, "rb")
-        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
-        self._frame_count = len(self._mmap) // SAVED_FRAME_SIZE
+        self._path = path
+        self._data: NDArray[np.uint8] = np.memmap(path, dtype=np.uint8, mode="r")
+        self._frame_count = len(self._data) // SAVED_FRAME_SIZE
 
     def close(self) -> None:
-        self._file.close()
+        # read_frame hands out copies, so this drops the last reference to the
+        # mapping and unmaps the file
+        self._data = np.empty(0, dtype=np.uint8)
+
+    @property
+    def path(self) -> Path:
+        return self._path
 
     @property
     def frame_count(self) -> int:
@@ -145,28 +212,33 @@ class RecordingReader:
 
     def _read_ts(self, index: int) -> datetime:
         start = index * SAVED_FRAME_SIZE
-        buf = self._mmap[start : start + 8]
-        unpacked = struct.unpack(
-            "<q",
-            buf,
-        )
-
-        return datetime.fromtimestamp(float(unpacked[0]) / 1000)
+        ts_ms = self._data[start : start + 8].view("<i8")[0]
+        return datetime.fromtimestamp(float(ts_ms) / 1000)
 
-    def read_frame(self, index: int, config: RenderConfig) -> CamFrame:
+    def read_frame(
+        self, index: int, config: RenderConfig, scale: int = RENDER_SCALE
+    ) -> CamFrame:
         ts = self._read_ts(index)
         data_start = index * SAVED_FRAME_SIZE + 8
         data_end = data_start + CAMERA_WIDTH * CAMERA_HEIGHT * 2
 
-        raw_thermal = np.frombuffer(self._mmap[data_start:data_end], dtype=np.uint16)
-        raw_thermal = raw_thermal.reshape((CAMERA_HEIGHT, CAMERA_WIDTH))
+        # Rendered straight from the mapped file
+        raw_thermal = (
+            self._data[data_start:data_end]
+            .view(np.uint16)
+            .reshape((CAMERA_HEIGHT, CAMERA_WIDTH))
+        )
 
-        img = render(config, raw_thermal, RENDER_WIDTH, RENDER_HEIGHT)
+        width = CAMERA_WIDTH * scale
+        height = CAMERA_HEIGHT * scale
+        img = render(config, raw_thermal, width, height)
         return CamFrame(
-            width=RENDER_WIDTH,
-            height=RENDER_HEIGHT,
+            width=width,
+            height=height,
             img=img,
-            raw_thermal=raw_thermal,
+            # A view would keep the file mapped after close(), which blocks
+            # renaming or deleting the recording on Windows
+            raw_thermal=raw_thermal.copy(),
             ts=ts.timestamp(),
         )
 
@@ -253,6 +325,7 @@ class Camera:
                 self._p3.start_streaming()
 
                 last_thermal: NDArray[np.uint16] | None = None
+                last_raw: NDArray[np.uint16] | None = None
 
                 while not self._ev_stop_thread.is_set():
                     raw_frame = self._p3.read_frame()
@@ -263,6 +336,15 @@ class Camera:
                     if thermal_raw is None:
                         continue
 
+                    # A repeated sensor frame carries nothing new, skip the
+                    # filtering, rendering and texture upload
+                    if last_raw is None or last_raw.shape != thermal_raw.shape:
+                        last_raw = thermal_raw.copy()
+                    elif np.array_equal(last_raw, thermal_raw):
+                        continue
+                    else:
+                        np.copyto(last_raw, thermal_raw)
+
                     thermal_raw = self.tnr(thermal_raw, last_thermal)
                     last_thermal = thermal_raw
 
@@ -313,7 +395,14 @@ class Camera:
         if prev_img is None:
             return img
 
-        result = alpha * img.astype(np.float32) + (1 - alpha) * prev_img.astype(
-            np.float32
+        if alpha == 0.5:
+            # floor((img + prev) / 2) without leaving uint16
+            result = np.right_shift(img, 1)
+            result += np.right_shift(prev_img, 1)
+            result += np.bitwise_and(np.bitwise_and(img, prev_img), 1)
+            return result
+
+        return np.asarray(
+            cv2.addWeighted(img, alpha, prev_img, 1.0 - alpha, 0.0, dtype=cv2.CV_16U),
+            dtype=np.uint16,
         )
-        return result.astype(np.uint16)
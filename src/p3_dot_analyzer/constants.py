@@ -11,6 +11,9 @@ DEFAULT_MAX_AREA = 300
 DEFAULT_MIN_CIRCULARITY = 0.5
 DEFAULT_BATCH_SAMPLING_RATE = 1
 DEFAULT_ANALYSIS_ENABLED = True
+# Quiet time after the last detection setting change before re-analyzing,
+# longer than the 50 ms auto-repeat of a held input +/- button
+ANALYSIS_DEBOUNCE_S = 0.1
 
 DEFAULT_RECORDING_FRAME_PERIOD_MS = 500
 
@@ -23,3 +26,4 @@ AREA_COLORS_RGBA = [
 ]
 AREA_FILL_ALPHA = 40
 AREA_COLORS_RGB = [(r, g, b) for r, g, b, _a in AREA_COLORS_RGBA]
+AREA_FILL_COLORS_RGBA = [(r, g, b, AREA_FILL_ALPHA) for r, g, b in AREA_COLORS_RGB]
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from pathlib import Path
+from typing import Any
 import logging
+import multiprocessing
 import os
+import time
 
 import dearpygui.dearpygui as dpg  # type: ignore
+import numpy as np
 
 from .models import NamedArea
+from .named_areas import flush_preview_rect
 
 from .camera import (
     RENDER_HEIGHT,
@@ -15,13 +21,59 @@ from .camera import (
     CamEvRecordingStats,
     CamEvVersion,
     CamEvConnectFailed,
+    CameraEvents,
 )
 from .render import RenderConfig
-from .settings_io import apply_settings_to_state, get_settings_path, load_settings
+from .services.analysis_service import shutdown_batch_pool
+from .settings_io import (
+    apply_settings_to_state,
+    flush_settings_save,
+    get_settings_path,
+    load_settings,
+)
 from .state import AppState, SettingsState, UiState
 from .ui.app import build_ui
 from .ui.recording_panel import update_recording_buttons, update_recording_indicator
-from .ui_helpers import render_frame, update_recording_camera_status
+from .ui_helpers import (
+    refresh_frame_input,
+    render_frame,
+    update_recording_camera_status,
+)
+
+MAX_CAMERA_EVENTS_PER_FRAME = 32
+# After this many loop iterations without any activity, the loop is slowed
+# down to IDLE_FRAME_PERIOD_S per iteration
+IDLE_ITERATIONS = 5
+IDLE_FRAME_PERIOD_S = 1 / 30
+
+
+def _on_camera_version(app_state: AppState, ev: CamEvVersion) -> None:
+    app_state.camera_connected = True
+    update_recording_camera_status(
+        app_state, f"Camera connected: {ev.name} {ev.version}"
+    )
+    update_recording_buttons(app_state)
+
+
+def _on_camera_connect_failed(app_state: AppState, ev: CamEvConnectFailed) -> None:
+    app_state.camera_connected = False
+    update_recording_camera_status(app_state, f"Connect failed: {ev.message}")
+    update_recording_buttons(app_state)
+
+
+def _on_recording_stats(app_state: AppState, ev: CamEvRecordingStats) -> None:
+    if app_state.recording.active:
+        status_label = "Paused" if app_state.recording.paused else "Recording"
+    else:
+        status_label = "Idle"
+    update_recording_indicator(app_state, status_label, ev)
+
+
+_EVENT_HANDLERS: dict[type[CameraEvents], Callable[[AppState, Any], None]] = {
+    CamEvVersion: _on_camera_version,
+    CamEvConnectFailed: _on_camera_connect_failed,
+    CamEvRecordingStats: _on_recording_stats,
+}
 
 
 def run() -> None:
@@ -29,19 +81,22 @@ def run() -> None:
     base_dir = Path(os.getcwd())
     settings_path = get_settings_path(base_dir)
 
-    logging.basicConfig(level=logging.DEBUG)
+    # Set P3_DEBUG=1 for debug logging
+    logging.basicConfig(
+        level=logging.DEBUG if os.environ.get("P3_DEBUG") else logging.WARNING
+    )
 
     dpg.create_context()
 
-    texture_tag = "analysis_texture"
-    recording_texture_tag = "recording_texture"
+    texture_tag = dpg.generate_uuid()
+    recording_texture_tag = dpg.generate_uuid()
     app_state = AppState(
         ui=UiState(
             texture_tag=texture_tag,
             recording_texture_tag=recording_texture_tag,
-            image_drawlist_tag="image_drawlist",
-            image_draw_tag="image_draw",
-            status_text_tag="status_text",
+            image_drawlist_tag=dpg.generate_uuid(),
+            image_draw_tag=dpg.generate_uuid(),
+            status_text_tag=dpg.generate_uuid(),
         ),
         settings=SettingsState(path=settings_path),
     )
@@ -81,21 +136,27 @@ def run() -> None:
         )
     )
 
+    # Raw textures take the rendered float32 buffers as they are, without
+    # converting them to a Python sequence on every update. Until the first
+    # frame arrives both show the same blank buffer, nothing writes into it.
+    blank_pixels = np.zeros(RENDER_WIDTH * RENDER_HEIGHT * 4, dtype=np.float32)
     with dpg.texture_registry():
-        dpg.add_dynamic_texture(
+        dpg.add_raw_texture(
             RENDER_WIDTH,
             RENDER_HEIGHT,
-            [0] * RENDER_WIDTH * RENDER_HEIGHT * 4,
+            blank_pixels,
+            format=dpg.mvFormat_Float_rgba,
             tag=texture_tag,
         )
-        dpg.add_dynamic_texture(
+        dpg.add_raw_texture(
             RENDER_WIDTH,
             RENDER_HEIGHT,
-            [0] * RENDER_WIDTH * RENDER_HEIGHT * 4,
+            blank_pixels,
+            format=dpg.mvFormat_Float_rgba,
             tag=recording_texture_tag,
         )
 
-    build_ui(app_state, camera)
+    poll_ui = build_ui(app_state, camera)
     dpg.create_viewport(title="P3 Camera Tecky - Image Viewer", width=1700, height=950)
     dpg.set_viewport_vsync(True)
     dpg.setup_dearpygui()
@@ -104,32 +165,32 @@ def run() -> None:
 
     camera.start()
 
+    idle_iterations = 0
     try:
         while dpg.is_dearpygui_running():
-            ev = camera.get_event()
-            match ev:
-                case CamEvVersion():
-                    app_state.camera_connected = True
-                    update_recording_camera_status(
-                        app_state, f"Camera connected: {ev.name} {ev.version}"
-                    )
-                    update_recording_buttons(app_state)
-                case CamEvConnectFailed():
-                    app_state.camera_connected = False
-                    update_recording_camera_status(
-                        app_state, f"Connect failed: {ev.message}"
-                    )
-                    update_recording_buttons(app_state)
-                case CamEvRecordingStats():
-                    if app_state.recording.active:
-                        status_label = (
-                            "Paused" if app_state.recording.paused else "Recording"
-                        )
-                    else:
-                        status_label = "Idle"
-                    update_recording_indicator(app_state, status_label, ev)
+            active = False
+            # Handle event bursts (e.g. on connect) within one frame, but
+            # bounded so a flood of events cannot starve rendering
+            for _ in range(MAX_CAMERA_EVENTS_PER_FRAME):
+                ev = camera.get_event()
+                if ev is None:
+                    break
+                active = True
+                handler = _EVENT_HANDLERS.get(type(ev))
+                if handler is not None:
+                    handler(app_state, ev)
+
+            active |= (
+                app_state.analysis.analysis_due_at is not None
+                or app_state.analysis.analysis_future is not None
+                or app_state.analysis.analysis_cleared
+                or app_state.analysis.batch_thread is not None
+            )
+            poll_ui()
+            flush_settings_save(app_state)
 
             frame = camera.take_frame()
+            active |= frame is not None
 
             if app_state.ui.active_tab == "recording_tab" and frame is not None:
                 render_frame(
@@ -140,13 +201,30 @@ def run() -> None:
                     update_timestamp=False,
                 )
 
+            active |= (
+                app_state.areas.pending_preview_rect is not None
+                or app_state.areas.preview_rect_clear_requested
+            )
+            flush_preview_rect(app_state)
+            mouse_pos = app_state.ui.frame_input.mouse_pos
+            refresh_frame_input(app_state)
+            active |= app_state.ui.frame_input.mouse_pos != mouse_pos
             dpg.render_dearpygui_frame()
+
+            # Nothing happening, yield the CPU instead of redrawing at the
+            # display refresh rate
+            idle_iterations = 0 if active else idle_iterations + 1
+            if idle_iterations > IDLE_ITERATIONS:
+                time.sleep(IDLE_FRAME_PERIOD_S)
     finally:
         camera.stop()
+        shutdown_batch_pool(app_state, wait=False)
         dpg.destroy_context()
 
 
 def main() -> None:
+    # Batch analysis runs in worker processes, which need this in frozen builds
+    multiprocessing.freeze_support()
     run()
 
 
@@ -3,6 +3,9 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import TypedDict
 
+import numpy as np
+from numpy.typing import NDArray
+
 
 @dataclass(slots=True)
 class NamedArea:
@@ -57,6 +60,8 @@ class AreaPStatPoint:
 class BatchAnalysisResult:
     """Results from batch analysis of all images."""
 
-    timestamps: list[float]  # seconds since start
-    area_counts: dict[str, list[int]]  # area_name -> counts at each timestamp
+    timestamps: NDArray[np.float64]  # seconds since start
+    area_names: list[str]
+    # (area, timestamp) -> counts, one row per area in area_names
+    counts: NDArray[np.int32]
     percentile_for_area: dict[int, dict[str, AreaPStatPoint]]
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Callable
 import dearpygui.dearpygui as dpg  # type: ignore
 
 from .state import AppState
-from .constants import AREA_COLORS_RGBA, AREA_FILL_ALPHA
+from .constants import AREA_COLORS_RGBA, AREA_FILL_COLORS_RGBA
 from .services.areas_service import create_named_area, delete_named_area
 from .settings_io import schedule_settings_save
 from .ui_helpers import update_status
@@ -12,53 +13,167 @@ from .ui_helpers import update_status
 
 def redraw_area_overlays(app_state: AppState) -> None:
     """Redraw all named area rectangles on the image drawlist."""
-    # Remove existing overlay rectangles
-    for tag in app_state.areas.area_overlay_tags:
-        if dpg.does_item_exist(tag):
-            dpg.delete_item(tag)
-    app_state.areas.area_overlay_tags.clear()
+    areas = app_state.areas
+    key = tuple((a.name, a.x, a.y, a.width, a.height) for a in areas.named_areas)
+    if key == areas.area_overlay_key:
+        return
+    areas.area_overlay_key = key
 
-    # Draw each named area
-    for i, area in enumerate(app_state.areas.named_areas):
-        color = AREA_COLORS_RGBA[i % len(AREA_COLORS_RGBA)]
-        fill_color = (color[0], color[1], color[2], AREA_FILL_ALPHA)
+    # Remove overlays of deleted areas
+    if not areas.named_areas:
+        dpg.delete_item(areas.area_overlay_layer_tag, children_only=True)
+    else:
+        for tags in areas.area_overlay_tags[len(areas.named_areas) :]:
+            for tag in tags:
+                dpg.delete_item(tag)
+    del areas.area_overlay_tags[len(areas.named_areas) :]
+
+    # Move the existing overlays, draw the missing ones
+    for i, area in enumerate(areas.named_areas):
+        pmin = (area.x, area.y)
+        pmax = (area.x + area.width, area.y + area.height)
+        label_pos = (area.x + 2, area.y + 2)
+        if i < len(areas.area_overlay_tags):
+            rect_tag, label_tag = areas.area_overlay_tags[i]
+            dpg.configure_item(rect_tag, pmin=pmin, pmax=pmax)
+            dpg.configure_item(label_tag, pos=label_pos, text=area.name)
+            continue
 
         # Draw rectangle
         rect_tag = f"area_rect_{i}"
         dpg.draw_rectangle(
-            pmin=(area.x, area.y),
-            pmax=(area.x + area.width, area.y + area.height),
-            color=color,
-            fill=fill_color,
+            pmin=pmin,
+            pmax=pmax,
+            color=AREA_COLORS_RGBA[i % len(AREA_COLORS_RGBA)],
+            fill=AREA_FILL_COLORS_RGBA[i % len(AREA_FILL_COLORS_RGBA)],
             thickness=2,
             tag=rect_tag,
-            parent=app_state.ui.image_drawlist_tag,
+            parent=areas.area_overlay_layer_tag,
         )
-        app_state.areas.area_overlay_tags.append(rect_tag)
 
         # Draw label
         label_tag = f"area_label_{i}"
         dpg.draw_text(
-            pos=(area.x + 2, area.y + 2),
+            pos=label_pos,
             text=area.name,
             color=(255, 255, 255, 255),
             size=14,
             tag=label_tag,
+            parent=areas.area_overlay_layer_tag,
+        )
+        areas.area_overlay_tags.append((rect_tag, label_tag))
+
+
+def flush_preview_rect(app_state: AppState) -> None:
+    """Apply the pending area-creation preview rectangle changes.
+
+    Called from the main loop only, so the rectangle is never created and
+    deleted from two threads at once.
+    """
+    if app_state.areas.preview_rect_clear_requested:
+        app_state.areas.preview_rect_clear_requested = False
+        if app_state.areas.preview_rect_created:
+            dpg.delete_item(app_state.areas.preview_rect_tag)
+            app_state.areas.preview_rect_created = False
+
+    bounds = app_state.areas.pending_preview_rect
+    if bounds is None:
+        return
+    app_state.areas.pending_preview_rect = None
+    min_x, min_y, max_x, max_y = bounds
+
+    # Update or create preview rectangle
+    if app_state.areas.preview_rect_created:
+        dpg.configure_item(
+            app_state.areas.preview_rect_tag,
+            pmin=(min_x, min_y),
+            pmax=(max_x, max_y),
+        )
+    else:
+        dpg.draw_rectangle(
+            pmin=(min_x, min_y),
+            pmax=(max_x, max_y),
+            color=(0, 255, 0, 255),
+            fill=(0, 255, 0, 50),
+            thickness=2,
+            tag=app_state.areas.preview_rect_tag,
             parent=app_state.ui.image_drawlist_tag,
         )
-        app_state.areas.area_overlay_tags.append(label_tag)
+        app_state.areas.preview_rect_created = True
+
+
+def clear_preview_rect(app_state: AppState) -> None:
+    """Drop pending preview updates and ask the main loop to remove it."""
+    app_state.areas.pending_preview_rect = None
+    app_state.areas.preview_rect_clear_requested = True
 
 
 def update_areas_list(
     app_state: AppState,
     on_areas_changed: Callable[[AppState], None] | None = None,
 ) -> None:
-    """Update the areas list in the Configuration window."""
+    """Update the areas list in the Configuration window.
+
+    The list is only rebuilt when areas or the analysis mode changed, otherwise
+    just the mark counts are refreshed.
+    """
     if not dpg.does_item_exist(app_state.areas.areas_list_tag):
         return
 
+    key = (
+        app_state.analysis.enabled,
+        tuple(
+            (a.name, a.x, a.y, a.width, a.height) for a in app_state.areas.named_areas
+        ),
+    )
+    if key == app_state.areas.areas_list_key:
+        refresh_areas_list_counts(app_state)
+        return
+    app_state.areas.areas_list_key = key
+    rebuild_areas_list(app_state, on_areas_changed)
+
+
+def refresh_areas_list_counts(app_state: AppState) -> None:
+    """Update the mark counts shown in the areas list."""
+    counts = app_state.analysis.area_mark_counts
+    for area, tag in zip(
+        app_state.areas.named_areas, app_state.areas.areas_list_count_tags
+    ):
+        dpg.set_value(tag, f"  Marks: {counts.get(area.name, 0)}")
+
+
+@dataclass(slots=True, frozen=True)
+class _AreaRowContext:
+    """user_data of the delete button of one areas list row."""
+
+    app_state: AppState
+    # Valid while the row exists, any change to the areas rebuilds the list
+    index: int
+    on_areas_changed: Callable[[AppState], None] | None
+
+
+def _on_area_delete(_sender: int, _app_data: None, ctx: _AreaRowContext) -> None:
+    app_state = ctx.app_state
+    deleted = delete_named_area(app_state, ctx.index)
+    if deleted is None:
+        return
+    redraw_area_overlays(app_state)
+    if ctx.on_areas_changed is not None:
+        ctx.on_areas_changed(app_state)
+    else:
+        update_areas_list(app_state)
+    schedule_settings_save(app_state)
+    update_status(app_state, f"Deleted area '{deleted.name}'")
+
+
+def rebuild_areas_list(
+    app_state: AppState,
+    on_areas_changed: Callable[[AppState], None] | None = None,
+) -> None:
+    """Recreate all rows of the areas list."""
     # Clear existing children
     dpg.delete_item(app_state.areas.areas_list_tag, children_only=True)
+    app_state.areas.areas_list_count_tags.clear()
 
     if not app_state.areas.named_areas:
         dpg.add_text("No areas defined", parent=app_state.areas.areas_list_tag)
@@ -69,22 +184,12 @@ def update_areas_list(
             with dpg.group(horizontal=True):
                 dpg.add_text(f"{area.name}")
 
-                def make_delete_callback(index: int) -> Callable[[int, None], None]:
-                    def delete_area(_sender: int, _app_data: None) -> None:
-                        deleted = delete_named_area(app_state, index)
-                        if deleted is None:
-                            return
-                        redraw_area_overlays(app_state)
-                        if on_areas_changed is not None:
-                            on_areas_changed(app_state)
-                        else:
-                            update_areas_list(app_state)
-                        schedule_settings_save(app_state)
-                        update_status(app_state, f"Deleted area '{deleted.name}'")
-
-                    return delete_area
-
-                dpg.add_button(label="X", callback=make_delete_callback(i), width=25)
+                dpg.add_button(
+                    label="X",
+                    callback=_on_area_delete,
+                    user_data=_AreaRowContext(app_state, i, on_areas_changed),
+                    width=25,
+                )
 
             # Show coordinates
             dpg.add_text(
@@ -95,79 +200,105 @@ def update_areas_list(
             # Show mark count if analysis mode is enabled
             if app_state.analysis.enabled:
                 count = app_state.analysis.area_mark_counts.get(area.name, 0)
-                dpg.add_text(
+                count_tag = dpg.add_text(
                     f"  Marks: {count}",
                     color=(255, 255, 0, 255),  # Yellow to stand out
                 )
+                app_state.areas.areas_list_count_tags.append(count_tag)
 
             dpg.add_separator()
 
 
-def show_area_name_popup(
-    app_state: AppState,
-    bounds: tuple[int, int, int, int],
-    on_areas_changed: Callable[[AppState], None] | None = None,
-) -> None:
-    """Show a popup to enter the name for a new area."""
+def _leave_create_mode(app_state: AppState) -> None:
+    app_state.areas.pending_area_bounds = None
+    app_state.areas.interaction_mode = "view"
+    dpg.configure_item(app_state.areas.mode_button_tag, label="Create Area")
+    dpg.hide_item(app_state.areas.area_name_popup_tag)
+
+
+def _on_area_name_confirm(_sender: int, _app_data: None, app_state: AppState) -> None:
+    bounds = app_state.areas.pending_area_bounds
+    if bounds is None:
+        return
     x, y, width, height = bounds
+    on_areas_changed: Callable[[AppState], None] | None = dpg.get_item_user_data(
+        app_state.areas.area_name_popup_tag
+    )
 
-    popup_tag = "area_name_popup"
-    input_tag = "area_name_input"
+    name = dpg.get_value(app_state.areas.area_name_input_tag).strip()
+    if not name:
+        name = f"Area {len(app_state.areas.named_areas) + 1}"
 
-    # Delete existing popup if any
-    if dpg.does_item_exist(popup_tag):
-        dpg.delete_item(popup_tag)
+    # Create the named area
+    create_named_area(app_state, name, bounds)
 
-    def on_confirm(_sender: int, _app_data: None) -> None:
-        name = dpg.get_value(input_tag).strip()
-        if not name:
-            name = f"Area {len(app_state.areas.named_areas) + 1}"
+    # Redraw overlays and update UI
+    redraw_area_overlays(app_state)
 
-        # Create the named area
-        create_named_area(app_state, name, bounds)
+    if on_areas_changed is not None:
+        on_areas_changed(app_state)
+    else:
+        update_areas_list(app_state)
 
-        # Redraw overlays and update UI
-        redraw_area_overlays(app_state)
+    schedule_settings_save(app_state)
+    update_status(
+        app_state, f"Created area '{name}' at ({x}, {y}) size {width}x{height}"
+    )
 
-        if on_areas_changed is not None:
-            on_areas_changed(app_state)
-        else:
-            update_areas_list(app_state)
+    # Switch back to view mode and close popup
+    _leave_create_mode(app_state)
 
-        schedule_settings_save(app_state)
-        update_status(
-            app_state, f"Created area '{name}' at ({x}, {y}) size {width}x{height}"
-        )
 
-        # Switch back to view mode
-        app_state.areas.interaction_mode = "view"
-        dpg.configure_item(app_state.areas.mode_button_tag, label="Create Area")
+def _on_area_name_cancel(_sender: int, _app_data: None, app_state: AppState) -> None:
+    _leave_create_mode(app_state)
+    update_status(app_state, "Area creation cancelled")
+
+
+def show_area_name_popup(
+    app_state: AppState,
+    bounds: tuple[int, int, int, int],
+    on_areas_changed: Callable[[AppState], None] | None = None,
+) -> None:
+    """Show a popup to enter the name for a new area.
+
+    The popup is created on first use and only shown again afterwards.
+    """
+    x, y, width, height = bounds
+    areas = app_state.areas
+    areas.pending_area_bounds = bounds
 
-        # Close popup
-        dpg.delete_item(popup_tag)
+    text = f"Area: ({x}, {y}) size {width}x{height}"
+    default_name = f"Area {len(areas.named_areas) + 1}"
 
-    def on_cancel(_sender: int, _app_data: None) -> None:
-        app_state.areas.interaction_mode = "view"
-        dpg.configure_item(app_state.areas.mode_button_tag, label="Create Area")
-        dpg.delete_item(popup_tag)
-        update_status(app_state, "Area creation cancelled")
+    if dpg.does_item_exist(areas.area_name_popup_tag):
+        dpg.set_value(areas.area_name_text_tag, text)
+        dpg.set_value(areas.area_name_input_tag, default_name)
+        dpg.configure_item(
+            areas.area_name_popup_tag, show=True, user_data=on_areas_changed
+        )
+        return
 
     with dpg.window(
         label="Name Area",
-        tag=popup_tag,
+        tag=areas.area_name_popup_tag,
         modal=True,
         no_close=True,
         pos=(400, 300),
         width=300,
         height=120,
+        user_data=on_areas_changed,
     ):
-        dpg.add_text(f"Area: ({x}, {y}) size {width}x{height}")
+        dpg.add_text(text, tag=areas.area_name_text_tag)
         dpg.add_input_text(
             label="Name",
-            tag=input_tag,
-            default_value=f"Area {len(app_state.areas.named_areas) + 1}",
+            tag=areas.area_name_input_tag,
+            default_value=default_name,
             width=200,
         )
         with dpg.group(horizontal=True):
-            dpg.add_button(label="Create", callback=on_confirm)
-            dpg.add_button(label="Cancel", callback=on_cancel)
+            dpg.add_button(
+                label="Create", callback=_on_area_name_confirm, user_data=app_state
+            )
+            dpg.add_button(
+                label="Cancel", callback=_on_area_name_cancel, user_data=app_state
+            )
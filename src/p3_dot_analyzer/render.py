@@ -3,6 +3,9 @@ from numpy.typing import NDArray
 import numpy as np
 import cv2
 from dataclasses import dataclass
+from typing import Any
+import functools
+import threading
 
 
 @dataclass(slots=True)
@@ -14,6 +17,20 @@ class RenderConfig:
 
 _clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
 
+# Per-thread intermediate buffers, reused across render() calls. Frames are
+# rendered on the camera thread, the UI thread and in batch worker processes.
+_scratch = threading.local()
+
+
+def _scratch_buf(
+    name: str, shape: tuple[int, ...], dtype: type[np.generic]
+) -> NDArray[Any]:
+    buf: NDArray[Any] | None = getattr(_scratch, name, None)
+    if buf is None or buf.shape != shape or buf.dtype != dtype:
+        buf = np.empty(shape, dtype=dtype)
+        setattr(_scratch, name, buf)
+    return buf
+
 
 def _dde(
     img_u8: NDArray[np.uint8],
@@ -33,23 +50,71 @@ def _dde(
         return img_u8
     # Create blurred version
     ksize = kernel_size | 1  # Ensure odd
-    blurred = cv2.GaussianBlur(img_u8, (ksize, ksize), 0)
-    # Unsharp mask
-    img_f = img_u8.astype(np.float32)
-    blurred_f = blurred.astype(np.float32)
-    enhanced = img_f + strength * (img_f - blurred_f)
-    return np.clip(enhanced, 0, 255).astype(np.uint8)
+    blurred = cv2.GaussianBlur(
+        img_u8,
+        (ksize, ksize),
+        0,
+        dst=_scratch_buf("dde_blur", img_u8.shape, np.uint8),
+    )
+    # Unsharp mask as (1 + s) * original - s * blurred, saturated to uint8
+    out = _scratch_buf("dde_u8", img_u8.shape, np.uint8)
+    cv2.addWeighted(img_u8, 1.0 + strength, blurred, -strength, 0.0, dst=out)
+    return out
+
+
+@functools.lru_cache(maxsize=4)
+def _agc_lut(temp_min: float, temp_max: float) -> NDArray[np.uint8]:
+    """Lookup table mapping every raw uint16 value to its AGC output."""
+    raw_min = (temp_min + 273.15) * 64
+    raw_max = (temp_max + 273.15) * 64
+    raw = np.arange(65536, dtype=np.float32)
+    normalized = (raw - raw_min) / (raw_max - raw_min)
+    lut: NDArray[np.uint8] = (np.clip(normalized, 0.0, 1.0) * 255).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
 
 
 def _agc_fixed(
     config: RenderConfig,
     img: NDArray[np.uint16],
 ) -> NDArray[np.uint8]:
-    """AGC with fixed temperature range (Celsius)."""
-    raw_min = (config.temp_min + 273.15) * 64
-    raw_max = (config.temp_max + 273.15) * 64
-    normalized = (img.astype(np.float32) - raw_min) / (raw_max - raw_min)
-    return (np.clip(normalized, 0.0, 1.0) * 255).astype(np.uint8)  # type: ignore
+    """AGC with fixed temperature range (Celsius).
+
+    The mapping only depends on the range, so it is a single gather from a
+    table that is rebuilt when the range changes.
+    """
+    lut = _agc_lut(config.temp_min, config.temp_max)
+    out = _scratch_buf("agc_u8", img.shape, np.uint8)
+    # Every uint16 is a valid index; "clip" just skips the bounds check buffer
+    np.take(lut, img, out=out, mode="clip")
+    return out
+
+
+@functools.lru_cache(maxsize=8)
+def _colormap_lut(colormap: ColormapID) -> NDArray[np.uint8]:
+    """The colormap sampled for all 256 gray levels, as a (256, 3) BGR table."""
+    gray_levels = np.arange(256, dtype=np.uint8).reshape((16, 16))
+    lut: NDArray[np.uint8] = np.ascontiguousarray(
+        apply_colormap(gray_levels, colormap), dtype=np.uint8
+    ).reshape((256, 3))
+    lut.flags.writeable = False
+    return lut
+
+
+@functools.lru_cache(maxsize=8)
+def _texture_lut(colormap: ColormapID) -> NDArray[np.float32]:
+    """The colormap as a (256, 4) table of RGBA texels normalized to 0-1."""
+    lut = np.empty((256, 4), dtype=np.float32)
+    # BGR -> RGB, normalized to 0-1 for dearpygui
+    np.divide(
+        _colormap_lut(colormap)[:, ::-1],
+        np.float32(255.0),
+        out=lut[:, :3],
+        dtype=np.float32,
+    )
+    lut[:, 3] = 1.0  # set alpha
+    lut.flags.writeable = False
+    return lut
 
 
 def render(
@@ -68,19 +133,17 @@ def render(
 
     # DDE: edge enhancement
     img = _dde(img)
-    img = apply_colormap(img, config.colormap)
-    # transform for dearpygui
+    # Upscale the single-channel image and colorize after, so the resize
+    # touches a third of the bytes and never blends colors
     img = np.asarray(
         cv2.resize(
             img,
             (width, height),
+            dst=_scratch_buf("resized", (height, width), np.uint8),
             interpolation=cv2.INTER_LINEAR,
         ),
         dtype=np.uint8,
     )
-    texture = np.empty((height, width, 4), dtype=np.float32)
-    texture[..., :3] = img[..., ::-1]  # BGR -> RGB
-    texture[..., 3] = 255.0  # set alpha
-    # normalize to 0-1 for dearpygui
-    texture = texture.reshape(-1) / 255.0
-    return texture
+    # Colorize straight into contiguous RGBA texels
+    texture = np.take(_texture_lut(config.colormap), img.reshape(-1), axis=0)
+    return texture.reshape(-1)
@@ -1,54 +1,98 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from collections.abc import Sequence
+from typing import Any, Callable
+from concurrent.futures import (
+    BrokenExecutor,
+    CancelledError,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from pathlib import Path
+import functools
+import itertools
+import math
 import os
+import threading
 import time
 
 import cv2
 import numpy as np
+from numpy.typing import NDArray
 
-from p3_dot_analyzer.camera import RecordingReader
+from p3_dot_analyzer.camera import RENDER_SCALE, CamFrame, RecordingReader
 
-from ..ui_helpers import get_temp_at_img
+from ..render import RenderConfig
+from .frame_utils import clamp, get_frame_temp
 
 from ..models import BatchAnalysisResult, NamedArea, AreaPStatPoint
-from ..state import AppState
+from ..state import AnalysisState, AppState
 
 WANTED_PERCENTILES = [10, 50, 90]
 MATCH_OVERLAP_THRESHOLD = 0.6
 RETIREMENT_FRAME_GAP = 3
+_FOUR_PI = 4.0 * math.pi
+# Batch frames are analyzed at native camera resolution (a quarter of the
+# pixels) when the smallest accepted mark still covers this many display
+# pixels. 50 pixels once downscaled is a blob of ~4 px radius, still round
+# enough for the circularity filter to match the full resolution result.
+REDUCED_RES_MIN_AREA = 4 * 50
+# Contour lists longer than this are evaluated on CONTOUR_THREADS threads
+PARALLEL_CONTOURS_MIN = 64
+CONTOUR_THREADS = 4
+# Contour lists kept per frame, keyed by threshold, for analysis re-runs
+CONTOUR_CACHE_SIZE = 4
 
 
 @dataclass(slots=True)
-class DetectedMark:
-    """A detected circular or elliptical mark."""
+class DetectedMarks:
+    """Detected circular or elliptical marks, one row per mark."""
+
+    centers_xy: NDArray[np.float32]  # (N, 2)
+    axes_ab: NDArray[np.float32]  # (N, 2) semi-major and semi-minor axis
+    angles: NDArray[np.float32]  # (N,) rotation angle in degrees
+
+    def __len__(self) -> int:
+        return len(self.angles)
+
+    @classmethod
+    def empty(cls) -> DetectedMarks:
+        return cls(
+            centers_xy=np.empty((0, 2), dtype=np.float32),
+            axes_ab=np.empty((0, 2), dtype=np.float32),
+            angles=np.empty(0, dtype=np.float32),
+        )
+
+    def radii(self) -> NDArray[np.float32]:
+        return np.maximum(self.axes_ab[:, 0], self.axes_ab[:, 1])
+
+    def upscaled(self, factor: int) -> DetectedMarks:
+        """Map marks detected on an image downscaled by factor back to full size."""
+        # Pixel centers of a linearly resized image sit at (x + 0.5) * f - 0.5.
+        offset = (factor - 1) / 2
+        return DetectedMarks(
+            centers_xy=self.centers_xy * factor + offset,
+            axes_ab=self.axes_ab * factor,
+            angles=self.angles,
+        )
 
-    center_x: float
-    center_y: float
-    axis_a: float  # semi-major axis
-    axis_b: float  # semi-minor axis
-    angle: float  # rotation angle in degrees
+    def bboxes(self) -> NDArray[np.float64]:
+        """Return (N, 4) bounding boxes as x1, y1, x2, y2."""
+        centers = self.centers_xy.astype(np.float64)
+        axes = self.axes_ab.astype(np.float64)
+        return np.hstack((centers - axes, centers + axes))
 
 
 @dataclass(slots=True)
 class _TrackedMark:
     id: int
-    mark: DetectedMark
+    center: tuple[float, float]
     bbox: tuple[float, float, float, float]
     last_seen_frame: int
 
 
-def _mark_bbox(mark: DetectedMark) -> tuple[float, float, float, float]:
-    return (
-        mark.center_x - mark.axis_a,
-        mark.center_y - mark.axis_b,
-        mark.center_x + mark.axis_a,
-        mark.center_y + mark.axis_b,
-    )
-
-
 def _bbox_overlap_ratio(
     bbox_a: tuple[float, float, float, float],
     bbox_b: tuple[float, float, float, float],
@@ -76,73 +120,47 @@ def _bbox_overlap_ratio(
     return inter_area / denom
 
 
-def detect_colored_marks(
-    image_rgba_dpg: np.ndarray,
-    base_x: int,
-    base_y: int,
-    tolerance: int = 30,
-    min_area: int = 200,
-    max_area: int = 200,
-    min_circularity: float = 0.5,
-) -> list[DetectedMark]:
-    """Detect circular/elliptical marks of a specific color in the image.
+# Per-thread scratch buffers reused across detect_colored_marks calls
+_scratch = threading.local()
+
+
+def _scratch_mask(shape: tuple[int, ...]) -> NDArray[np.uint8]:
+    mask: NDArray[np.uint8] | None = getattr(_scratch, "mask", None)
+    if mask is None or mask.shape != shape:
+        mask = np.empty(shape, dtype=np.uint8)
+        _scratch.mask = mask
+    return mask
+
+
+def image_value_channel(image_rgba_dpg: np.ndarray) -> NDArray[np.uint8]:
+    """Return the uint8 HSV value channel of an RGBA float image.
 
     Args:
-        image_bgr: Image in BGR format (as loaded by OpenCV).
-        base_x: Base point x coordinate in image space.
-        base_y: Base point y coordinate in image space.
-        tolerance: Tolerance for color matching in HSV space.
-        min_area: Minimum contour area to consider.
-        max_area: Maximum contour area to consider.
-        min_circularity: Minimum circularity threshold (0-1, circle=1).
+        image_rgba_dpg: Image in RGBA float format (as rendered for DearPyGui).
 
     Returns:
-        List of detected marks with their positions and dimensions.
+        H x W uint8 array of max(R, G, B).
     """
-
-    # Convert image to HSV
     # rgba: H x W x 4, float32 in [0,1]
-    # Convert RGBA -> BGR
-    image_bgr = cv2.cvtColor(
-        np.clip(image_rgba_dpg * 255.0, 0, 255).astype(np.uint8), cv2.COLOR_RGBA2BGR
-    )
-    # BGR -> HSV
-    image_hsv = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2HSV)
-
-    # Get base point temperature (color)
-    base = image_hsv[base_y, base_x]
-
-    # We use B&W image only, so we only count with V
-    _, _, v = base
-    v_tolerance = tolerance
-
-    # Cut off everything below base + tolerance
-    lower_bound = np.array(
-        [
-            0,
-            0,
-            min(255, int(v) + v_tolerance),
-        ]
-    )
-    upper_bound = np.array(
-        [
-            179,
-            255,
-            255,
-        ]
-    )
+    # We use B&W image only, so we only count with the HSV value channel,
+    # which is max(R, G, B). H and S are not constrained by the mask, so
+    # a single pass over V yields the same mask as the full HSV conversion.
+    # Taking the max before the uint8 conversion is exact, as the conversion
+    # is monotonic.
+    return np.clip(image_rgba_dpg[..., :3].max(axis=2) * 255.0, 0, 255).astype(np.uint8)
 
-    # Create mask for the target color
-    mask = cv2.inRange(image_hsv, lower_bound, upper_bound)
 
-    # cv2.imshow("image", mask)
-    # cv2.waitKey(0)
+# Center, semi-axes and angle of one detected mark
+_MarkRow = tuple[Sequence[float], tuple[float, float], float]
 
-    # Find contours
-    contours, _ = cv2.findContours(mask, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
-
-    detected_marks: list[DetectedMark] = []
 
+def _eval_contours(
+    contours: Sequence[np.ndarray],
+    min_area: float,
+    max_area: float,
+    min_circularity: float,
+) -> list[_MarkRow]:
+    rows: list[_MarkRow] = []
     for contour in contours:
         area = cv2.contourArea(contour)
         if area < min_area:
@@ -154,99 +172,193 @@ def detect_colored_marks(
         if perimeter == 0:
             continue
 
-        # Calculate circularity: 4 * pi * area / perimeter^2
-        circularity = 4 * np.pi * area / (perimeter * perimeter)
-
-        if circularity < min_circularity:
+        # Circularity 4 * pi * area / perimeter^2, compared without division
+        if min_circularity * perimeter * perimeter > _FOUR_PI * area:
             continue
 
-        # Need at least 5 points to fit an ellipse
-        if len(contour) >= 5:
-            ellipse = cv2.fitEllipse(contour)
-            center, axes, angle = ellipse
-            detected_marks.append(
-                DetectedMark(
-                    center_x=center[0],
-                    center_y=center[1],
-                    axis_a=axes[0]
-                    / 2,  # fitEllipse returns full axes, we want semi-axes
-                    axis_b=axes[1] / 2,
-                    angle=angle,
-                )
-            )
-        else:
-            # Fall back to minimum enclosing circle
-            (cx, cy), radius = cv2.minEnclosingCircle(contour)
-            detected_marks.append(
-                DetectedMark(
-                    center_x=cx,
-                    center_y=cy,
-                    axis_a=radius,
-                    axis_b=radius,
-                    angle=0,
+        # Consumers only use the center and the larger axis, so the cheap
+        # enclosing circle is enough; an ellipse fit would be wasted work.
+        center, radius = cv2.minEnclosingCircle(contour)
+        rows.append((center, (radius, radius), 0.0))
+    return rows
+
+
+_contour_pool: ThreadPoolExecutor | None = None
+_contour_pool_pid = 0
+
+
+def _contour_executor() -> ThreadPoolExecutor:
+    global _contour_pool, _contour_pool_pid
+    # Threads do not survive a fork, so a forked child needs its own pool
+    if _contour_pool is None or _contour_pool_pid != os.getpid():
+        _contour_pool = ThreadPoolExecutor(max_workers=CONTOUR_THREADS)
+        _contour_pool_pid = os.getpid()
+    return _contour_pool
+
+
+def _find_mark_contours(
+    image_value: NDArray[np.uint8], threshold: int
+) -> Sequence[np.ndarray]:
+    # Cut off everything below the threshold
+    mask = cv2.inRange(
+        image_value,
+        threshold,
+        255,
+        dst=_scratch_mask(image_value.shape),
+    )
+
+    # cv2.imshow("image", mask)
+    # cv2.waitKey(0)
+
+    # Nothing above the threshold (e.g. late frames where every mark is gone)
+    if not cv2.countNonZero(mask):
+        return ()
+
+    # Find contours
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_TC89_L1)
+    return contours
+
+
+def _marks_from_contours(
+    contours: Sequence[np.ndarray],
+    min_area: float,
+    max_area: float,
+    min_circularity: float,
+) -> DetectedMarks:
+    if len(contours) > PARALLEL_CONTOURS_MIN:
+        # cv2 releases the GIL, so noisy frames with many contours are split
+        # across threads
+        chunk_size = -(-len(contours) // CONTOUR_THREADS)
+        chunks = [
+            contours[i : i + chunk_size] for i in range(0, len(contours), chunk_size)
+        ]
+        rows = list(
+            itertools.chain.from_iterable(
+                _contour_executor().map(
+                    functools.partial(
+                        _eval_contours,
+                        min_area=min_area,
+                        max_area=max_area,
+                        min_circularity=min_circularity,
+                    ),
+                    chunks,
                 )
             )
+        )
+    else:
+        rows = _eval_contours(contours, min_area, max_area, min_circularity)
+
+    if not rows:
+        return DetectedMarks.empty()
+
+    centers, axes, angles = zip(*rows, strict=True)
+    return DetectedMarks(
+        centers_xy=np.array(centers, dtype=np.float32).reshape(-1, 2),
+        axes_ab=np.array(axes, dtype=np.float32).reshape(-1, 2),
+        angles=np.array(angles, dtype=np.float32),
+    )
+
+
+def _mark_threshold(
+    image_value: NDArray[np.uint8], base_x: int, base_y: int, tolerance: int
+) -> int:
+    # Base point temperature (color) plus tolerance
+    return min(255, int(image_value[base_y, base_x]) + tolerance)
+
+
+def detect_colored_marks(
+    image_rgba_dpg: np.ndarray,
+    base_x: int,
+    base_y: int,
+    tolerance: int = 30,
+    min_area: float = 200,
+    max_area: float = 200,
+    min_circularity: float = 0.5,
+    image_value: NDArray[np.uint8] | None = None,
+) -> DetectedMarks:
+    """Detect circular/elliptical marks of a specific color in the image.
+
+    Args:
+        image_rgba_dpg: Image in RGBA float format (as rendered for DearPyGui).
+        base_x: Base point x coordinate in image space.
+        base_y: Base point y coordinate in image space.
+        tolerance: Tolerance for color matching in HSV space.
+        min_area: Minimum contour area to consider.
+        max_area: Maximum contour area to consider.
+        min_circularity: Minimum circularity threshold (0-1, circle=1).
+        image_value: Precomputed image_value_channel() of the image, if any.
+
+    Returns:
+        DetectedMarks with one row per mark in its parallel center, axes and
+        angle arrays.
+    """
+
+    if image_value is None:
+        image_value = image_value_channel(image_rgba_dpg)
 
-    return detected_marks
+    contours = _find_mark_contours(
+        image_value, _mark_threshold(image_value, base_x, base_y, tolerance)
+    )
+    return _marks_from_contours(contours, min_area, max_area, min_circularity)
+
+
+def _centers_in_areas(
+    centers: NDArray[np.floating[Any]],
+    named_areas: Sequence[NamedArea],
+) -> NDArray[np.bool_]:
+    """Return an (N marks, M areas) matrix of mark centers inside area bounds."""
+    boxes = np.array(
+        [(a.x, a.y, a.x + a.width, a.y + a.height) for a in named_areas],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+    xs = centers[:, 0, None]
+    ys = centers[:, 1, None]
+    return (
+        (xs >= boxes[:, 0])
+        & (xs <= boxes[:, 2])
+        & (ys >= boxes[:, 1])
+        & (ys <= boxes[:, 3])
+    )
 
 
 def count_marks_in_areas(
-    marks: list[DetectedMark],
-    named_areas: list[NamedArea],
+    marks: DetectedMarks,
+    named_areas: Sequence[NamedArea],
 ) -> dict[str, int]:
     """Count how many marks overlap with each named area."""
-    counts: dict[str, int] = {}
-
-    for area in named_areas:
-        count = 0
-        area_x1 = area.x
-        area_y1 = area.y
-        area_x2 = area.x + area.width
-        area_y2 = area.y + area.height
-
-        for mark in marks:
-            # Check if mark center is within the area bounds
-            if (
-                area_x1 <= mark.center_x <= area_x2
-                and area_y1 <= mark.center_y <= area_y2
-            ):
-                count += 1
-
-        counts[area.name] = count
-
-    return counts
+    counts = _centers_in_areas(marks.centers_xy, named_areas).sum(axis=0)
+    return {area.name: int(count) for area, count in zip(named_areas, counts)}
 
 
 def find_marks_in_areas(
     marks: list[_TrackedMark],
     named_areas: list[NamedArea],
 ) -> dict[str, list[_TrackedMark]]:
-    """Count how many marks overlap with each named area."""
-    counts: dict[str, list[_TrackedMark]] = {}
-
-    for area in named_areas:
-        marks_in_area: list[_TrackedMark] = []
-        area_x1 = area.x
-        area_y1 = area.y
-        area_x2 = area.x + area.width
-        area_y2 = area.y + area.height
-
-        for mark in marks:
-            # Check if mark center is within the area bounds
-            if (
-                area_x1 <= mark.mark.center_x <= area_x2
-                and area_y1 <= mark.mark.center_y <= area_y2
-            ):
-                marks_in_area.append(mark)
+    """Find the marks whose centers lie within each named area."""
+    centers = np.array([m.center for m in marks], dtype=np.float64).reshape(-1, 2)
+    inside = _centers_in_areas(centers, named_areas)
+    return {
+        area.name: [marks[i] for i in np.flatnonzero(inside[:, area_idx])]
+        for area_idx, area in enumerate(named_areas)
+    }
 
-        counts[area.name] = marks_in_area
 
-    return counts
+@dataclass(slots=True, frozen=True)
+class FrameAnalysisJob:
+    """Inputs of one live frame analysis, snapshotted on the UI thread."""
 
+    frame: CamFrame
+    base_x: int
+    base_y: int
+    tolerance: int
+    min_area: int
+    max_area: int
+    min_circularity: float
+    named_areas: tuple[NamedArea, ...]
 
-def analyze_current_frame(
-    app_state: AppState,
-) -> tuple[list[DetectedMark], dict[str, int]] | None:
+
+def frame_analysis_job(app_state: AppState) -> FrameAnalysisJob | None:
+    """Snapshot what analyzing the current frame needs, None if it can't run."""
     if not app_state.analysis.enabled:
         return None
     if app_state.analysis.base_x is None or app_state.analysis.base_y is None:
@@ -261,61 +373,130 @@ def analyze_current_frame(
     ):
         return None
 
-    marks = detect_colored_marks(
-        app_state.render.current_frame.img.reshape(
-            (
-                app_state.render.current_frame.height,
-                app_state.render.current_frame.width,
-                4,
-            )
-        ),
-        app_state.analysis.base_x,
-        app_state.analysis.base_y,
+    return FrameAnalysisJob(
+        frame=app_state.render.current_frame,
+        base_x=app_state.analysis.base_x,
+        base_y=app_state.analysis.base_y,
         tolerance=app_state.analysis.color_tolerance,
         min_area=app_state.analysis.min_area,
         max_area=app_state.analysis.max_area,
         min_circularity=app_state.analysis.min_circularity,
+        named_areas=tuple(replace(area) for area in app_state.areas.named_areas),
+    )
+
+
+def analyze_frame(
+    job: FrameAnalysisJob, analysis: AnalysisState
+) -> tuple[DetectedMarks, dict[str, int]]:
+    """Detect marks in the job's frame and count them per named area.
+
+    Runs on the analysis worker, the only thread using the caches in analysis.
+    """
+    frame = job.frame
+    image_rgba = frame.img.reshape((frame.height, frame.width, 4))
+
+    # Slider tweaks re-run the analysis on the same frame, so the value
+    # channel is computed only once per rendered frame.
+    cache = analysis.value_channel_cache
+    contour_cache = analysis.contour_cache
+    if cache is None or cache[0] is not frame:
+        cache = (frame, image_value_channel(image_rgba))
+        analysis.value_channel_cache = cache
+        contour_cache.clear()
+
+    # The contours only depend on the threshold, so area and circularity
+    # changes just re-filter them.
+    threshold = _mark_threshold(cache[1], job.base_x, job.base_y, job.tolerance)
+    contours = contour_cache.get(threshold)
+    if contours is None:
+        contours = _find_mark_contours(cache[1], threshold)
+        if len(contour_cache) >= CONTOUR_CACHE_SIZE:
+            del contour_cache[next(iter(contour_cache))]
+        contour_cache[threshold] = contours
+
+    marks = _marks_from_contours(
+        contours, job.min_area, job.max_area, job.min_circularity
     )
-    counts = count_marks_in_areas(marks, app_state.areas.named_areas)
+    counts = count_marks_in_areas(marks, job.named_areas)
     return marks, counts
 
 
+_analysis_pool: ThreadPoolExecutor | None = None
+
+
+def submit_frame_analysis(
+    job: FrameAnalysisJob, analysis: AnalysisState
+) -> Future[tuple[DetectedMarks, dict[str, int]]]:
+    """Queue analyze_frame on the single analysis worker thread."""
+    global _analysis_pool
+    if _analysis_pool is None:
+        _analysis_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="analysis"
+        )
+    return _analysis_pool.submit(analyze_frame, job, analysis)
+
+
 @dataclass(slots=True)
 class _LoadAndDetectResult:
     image_index: int
     timestamp: float
-    marks: list[DetectedMark] | None
+    marks: DetectedMarks | None
     base_temp_c: float
 
 
+@dataclass(slots=True, frozen=True)
+class _BatchJob:
+    """Everything a batch worker process needs to analyze one frame."""
+
+    recording_path: Path
+    render_config: RenderConfig
+    render_scale: int
+    base_x: int
+    base_y: int
+    tolerance: int
+    min_area: int
+    max_area: int
+    min_circularity: float
+    emissivity: float
+    reflected_temp: float
+
+
+_worker_reader: RecordingReader | None = None
+
+
+def _get_worker_reader(path: Path) -> RecordingReader:
+    global _worker_reader
+    if _worker_reader is None or _worker_reader.path != path:
+        if _worker_reader is not None:
+            _worker_reader.close()
+        _worker_reader = RecordingReader(path)
+    return _worker_reader
+
+
 def _load_and_detect(
-    app_state: AppState,
+    job: _BatchJob,
     image_index: int,
 ) -> _LoadAndDetectResult:
-    assert app_state.recording.reader is not None
     # Load image
-    frame = app_state.recording.reader.read_frame(
-        image_index, app_state.build_render_config()
+    frame = _get_worker_reader(job.recording_path).read_frame(
+        image_index, job.render_config, job.render_scale
     )
 
-    if frame is None:
-        raise RuntimeError(f"Failed to load frame {image_index}")
-
-    assert app_state.analysis.base_x is not None
-    assert app_state.analysis.base_y is not None
-
-    # Detect marks
+    # Detect marks, in display coordinates regardless of the render scale
+    downscale = RENDER_SCALE // job.render_scale
     marks = detect_colored_marks(
         frame.img.reshape((frame.height, frame.width, 4)),
-        app_state.analysis.base_x,
-        app_state.analysis.base_y,
-        tolerance=app_state.analysis.color_tolerance,
-        min_area=app_state.analysis.min_area,
-        max_area=app_state.analysis.max_area,
-        min_circularity=app_state.analysis.min_circularity,
+        job.base_x // downscale,
+        job.base_y // downscale,
+        tolerance=job.tolerance,
+        min_area=job.min_area / downscale**2,
+        max_area=job.max_area / downscale**2,
+        min_circularity=job.min_circularity,
     )
-    base_temp = get_temp_at_img(
-        app_state, frame, app_state.analysis.base_x, app_state.analysis.base_y
+    if downscale != 1:
+        marks = marks.upscaled(downscale)
+    base_temp = get_frame_temp(
+        frame, job.base_x, job.base_y, job.emissivity, job.reflected_temp
     )
     assert base_temp is not None
 
@@ -349,12 +530,15 @@ def _build_batch_points_from_results(
     next_mark_id = 0
 
     for frame_idx, result in enumerate(results):
-        marks = result.marks or []
+        marks = result.marks if result.marks is not None else DetectedMarks.empty()
         frame_marks: list[_TrackedMark] = []
         matched_active: set[int] = set()
 
-        for mark in marks:
-            bbox = _mark_bbox(mark)
+        for center_xy, bbox_xyxy in zip(
+            marks.centers_xy.tolist(), marks.bboxes().tolist()
+        ):
+            center = (center_xy[0], center_xy[1])
+            bbox = (bbox_xyxy[0], bbox_xyxy[1], bbox_xyxy[2], bbox_xyxy[3])
             if any(
                 _bbox_overlap_ratio(bbox, retired) > MATCH_OVERLAP_THRESHOLD
                 for retired in retired_bboxes
@@ -373,14 +557,14 @@ def _build_batch_points_from_results(
 
             if best_idx >= 0 and best_ratio > MATCH_OVERLAP_THRESHOLD:
                 tracked = active_marks[best_idx]
-                tracked.mark = mark
+                tracked.center = center
                 tracked.bbox = bbox
                 tracked.last_seen_frame = frame_idx
                 matched_active.add(best_idx)
             else:
                 tracked = _TrackedMark(
                     id=next_mark_id,
-                    mark=mark,
+                    center=center,
                     bbox=bbox,
                     last_seen_frame=frame_idx,
                 )
@@ -414,12 +598,67 @@ def _build_batch_points_from_results(
     return points
 
 
+def _get_batch_pool(app_state: AppState) -> ProcessPoolExecutor:
+    """Return the batch worker pool, starting it on first use.
+
+    The pool lives for the whole app session so repeated batch runs do not
+    pay the worker startup cost again.
+    """
+    if app_state.analysis.batch_pool is None:
+        app_state.analysis.batch_pool = ProcessPoolExecutor(
+            max_workers=os.process_cpu_count()
+        )
+    return app_state.analysis.batch_pool
+
+
+def is_batch_running(app_state: AppState) -> bool:
+    """Return whether a batch analysis thread is still working."""
+    thread = app_state.analysis.batch_thread
+    return thread is not None and thread.is_alive()
+
+
+def shutdown_batch_pool(app_state: AppState, wait: bool = True) -> None:
+    """Stop the batch worker pool, releasing the recordings workers hold open.
+
+    A batch still running is cancelled.
+
+    Args:
+        app_state: Application state holding the pool.
+        wait: Wait for the worker processes to exit, so the recordings they
+            mapped are closed once this returns. Only skip this on app exit.
+    """
+    if app_state.analysis.batch_pool is not None:
+        app_state.analysis.batch_pool.shutdown(wait=wait, cancel_futures=True)
+        app_state.analysis.batch_pool = None
+
+
 def _collect_batch_points(
     app_state: AppState,
     reader: RecordingReader,
     sampling_rate: int,
     progress_callback: Callable[[int, int], None] | None,
 ) -> list[_BatchPoint]:
+    assert app_state.analysis.base_x is not None
+    assert app_state.analysis.base_y is not None
+
+    # Only this small, picklable job crosses the process boundary; each
+    # worker opens the recording on its own.
+    job = _BatchJob(
+        recording_path=reader.path,
+        render_config=app_state.build_render_config(),
+        render_scale=(
+            1 if app_state.analysis.min_area >= REDUCED_RES_MIN_AREA else RENDER_SCALE
+        ),
+        base_x=app_state.analysis.base_x,
+        base_y=app_state.analysis.base_y,
+        tolerance=app_state.analysis.color_tolerance,
+        min_area=app_state.analysis.min_area,
+        max_area=app_state.analysis.max_area,
+        min_circularity=app_state.analysis.min_circularity,
+        emissivity=app_state.render.emissivity,
+        reflected_temp=app_state.render.reflected_temp,
+    )
+
     results: list[_LoadAndDetectResult] = []
 
     indices_to_process = list(range(0, reader.frame_count, sampling_rate))
@@ -427,24 +666,24 @@ def _collect_batch_points(
 
     last_progress_time = 0.0
 
-    with ThreadPoolExecutor(max_workers=os.process_cpu_count()) as executor:
-        futures = [
-            executor.submit(_load_and_detect, app_state, i) for i in indices_to_process
-        ]
-
-        progress_idx = 0
-        start_ts = reader.ts_start.timestamp()
-        for fut in as_completed(futures):
-            result = fut.result()
-            progress_idx += 1
-
-            now = time.monotonic()
-            if now - last_progress_time > 0.3:
-                last_progress_time = now
-                if progress_callback is not None:
-                    progress_callback(progress_idx, total)
+    executor = _get_batch_pool(app_state)
+    start_ts = reader.ts_start.timestamp()
+    for progress_idx, result in enumerate(
+        executor.map(
+            _load_and_detect,
+            itertools.repeat(job),
+            indices_to_process,
+            chunksize=8,
+        ),
+        start=1,
+    ):
+        now = time.monotonic()
+        if now - last_progress_time > 0.3:
+            last_progress_time = now
+            if progress_callback is not None:
+                progress_callback(progress_idx, total)
 
-            results.append(result)
+        results.append(result)
 
     return _build_batch_points_from_results(app_state, results, start_ts)
 
@@ -453,57 +692,50 @@ def _build_batch_result(
     points: list[_BatchPoint],
     named_areas: list[NamedArea],
 ) -> BatchAnalysisResult:
-    timestamps = [p.timestamp for p in points]
+    total = len(points)
+    timestamps = np.fromiter(
+        (p.timestamp for p in points), dtype=np.float64, count=total
+    )
 
-    running_ids: dict[str, set[int]] = {area.name: set() for area in named_areas}
-    running_counts: dict[str, list[int]] = {area.name: [] for area in named_areas}
     percentile_for_area: dict[int, dict[str, AreaPStatPoint]] = {
         pct: {} for pct in WANTED_PERCENTILES
     }
 
-    for point in points:
-        for area in named_areas:
-            area_name = area.name
-            running_ids[area_name].update(
-                mark.id for mark in point.marks_in_areas[area_name]
-            )
-            running_counts[area_name].append(len(running_ids[area_name]))
-
-    area_pct_series: dict[str, list[int]] = {}
-    for area in named_areas:
-        area_name = area.name
-        max_count = running_counts[area_name][-1] if running_counts[area_name] else 0
-        pct_series: list[int] = []
-        pct_idx = 0
-
+    area_names = [area.name for area in named_areas]
+    counts = np.zeros((len(area_names), total), dtype=np.int32)
+    running_counts = np.empty(total, dtype=np.int32)
+    for area_idx, area_name in enumerate(area_names):
+        running_ids: set[int] = set()
         for idx, point in enumerate(points):
-            if max_count == 0:
-                pct_series.append(0)
-                continue
-
-            running_count = running_counts[area_name][idx]
-            current_pct = int(running_count / max_count * 100)
-            pct_series.append(current_pct)
+            running_ids.update(mark.id for mark in point.marks_in_areas[area_name])
+            running_counts[idx] = len(running_ids)
 
-            while (
-                pct_idx < len(WANTED_PERCENTILES)
-                and current_pct >= WANTED_PERCENTILES[pct_idx]
-            ):
-                pct = WANTED_PERCENTILES[pct_idx]
-                percentile_for_area[pct][area_name] = AreaPStatPoint(
-                    point.timestamp,
-                    point.base_temp_c,
-                    running_count,
-                    max_count,
-                    point.image_index,
-                )
-                pct_idx += 1
+        max_count = len(running_ids)
+        if max_count == 0:
+            continue
 
-        area_pct_series[area_name] = pct_series
+        pct_series = counts[area_idx]
+        pct_series[:] = running_counts / max_count * 100
+
+        # Running counts never decrease, so each percentile is reached at the
+        # first point whose series value gets to it
+        for pct in WANTED_PERCENTILES:
+            idx = int(np.argmax(pct_series >= pct))
+            if pct_series[idx] < pct:
+                break
+            point = points[idx]
+            percentile_for_area[pct][area_name] = AreaPStatPoint(
+                point.timestamp,
+                point.base_temp_c,
+                int(running_counts[idx]),
+                max_count,
+                point.image_index,
+            )
 
     return BatchAnalysisResult(
         timestamps=timestamps,
-        area_counts=area_pct_series,
+        area_names=area_names,
+        counts=counts,
         percentile_for_area=percentile_for_area,
     )
 
@@ -524,13 +756,18 @@ def run_batch_analysis(
     if not reader or not reader.frame_count:
         return
 
-    sampling_rate = max(1, min(100, app_state.analysis.batch_sampling_rate))
-    points = _collect_batch_points(
-        app_state,
-        reader,
-        sampling_rate,
-        progress_callback,
-    )
+    sampling_rate = clamp(app_state.analysis.batch_sampling_rate, 1, 100)
+    try:
+        points = _collect_batch_points(
+            app_state,
+            reader,
+            sampling_rate,
+            progress_callback,
+        )
+    except (CancelledError, BrokenExecutor):  # fmt: skip
+        # shutdown_batch_pool stopped the pool under this batch
+        app_state.analysis.batch_result = None
+        return
     app_state.analysis.batch_result = _build_batch_result(
         points,
         app_state.areas.named_areas,
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from p3_camera import EnvParams, raw_to_celsius_corrected  # type: ignore[import-untyped]
+
+from ..camera import CamFrame, RENDER_SCALE
+
+
+def clamp[T: (int, float)](value: T, min_value: T, max_value: T) -> T:
+    """Limit value to the inclusive range [min_value, max_value]."""
+    if value < min_value:
+        return min_value
+    if value > max_value:
+        return max_value
+    return value
+
+
+def get_frame_temp(
+    frame: CamFrame,
+    img_x: int,
+    img_y: int,
+    emissivity: float,
+    reflected_temp: float,
+) -> float | None:
+    """Get the temperature at the given display image coordinates of a frame.
+
+    The coordinates are always in display (RENDER_SCALE) space, regardless of
+    the resolution the frame itself was rendered at.
+    """
+    if img_x < 0 or img_y < 0:
+        return None
+
+    img_y = img_y // RENDER_SCALE
+    img_x = img_x // RENDER_SCALE
+
+    # Bounds check
+    h, w = frame.raw_thermal.shape
+    if img_x >= w or img_y >= h:
+        return None
+
+    env = EnvParams(emissivity=emissivity, reflected_temp=reflected_temp)
+    return float(
+        raw_to_celsius_corrected(
+            float(frame.raw_thermal[img_y, img_x]),
+            env,
+        )
+    )
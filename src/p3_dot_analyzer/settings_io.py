@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 from pathlib import Path
+from queue import Empty, Queue
+from threading import Thread
 import json
+import time
 from typing import Any
 
 from .models import NamedArea, NamedAreaData, SettingsData
 from .state import AppState
 
+SETTINGS_SAVE_DELAY_S = 1.0
+
 
 def get_settings_path(base_dir: Path) -> Path:
     return base_dir / "settings.json"
@@ -194,22 +199,54 @@ def settings_from_state(app_state: AppState) -> SettingsData:
     }
 
 
-def save_settings(path: Path, app_state: AppState) -> None:
-    data = settings_from_state(app_state)
+def _write_settings(path: Path, data: SettingsData) -> None:
     try:
         path.write_text(json.dumps(data, indent=2), encoding="utf-8")
     except OSError:
         return
 
 
+def save_settings(path: Path, app_state: AppState) -> None:
+    _write_settings(path, settings_from_state(app_state))
+
+
+def _settings_writer(path: Path, pending: Queue[SettingsData]) -> None:
+    while True:
+        data = pending.get()
+        # Skip snapshots that were superseded while the last write ran
+        while True:
+            try:
+                data = pending.get_nowait()
+            except Empty:
+                break
+        _write_settings(path, data)
+
+
 def schedule_settings_save(app_state: AppState) -> None:
     if app_state.settings.path is None:
         return
-    if app_state.settings.save_timer is not None:
-        app_state.settings.save_timer.cancel()
-    from threading import Timer
-
-    timer = Timer(1.0, save_settings, args=(app_state.settings.path, app_state))
-    timer.daemon = True
-    app_state.settings.save_timer = timer
-    timer.start()
+    # Just (re)arm the deadline; flush_settings_save does the actual work
+    app_state.settings.save_due_at = time.monotonic() + SETTINGS_SAVE_DELAY_S
+
+
+def flush_settings_save(app_state: AppState) -> None:
+    """Hand the settings to the writer thread once the save deadline passed.
+
+    Called from the main loop; the snapshot is taken on the UI thread and the
+    file is written by a single background thread.
+    """
+    due_at = app_state.settings.save_due_at
+    if due_at is None or time.monotonic() < due_at:
+        return
+    app_state.settings.save_due_at = None
+    if app_state.settings.path is None:
+        return
+    if app_state.settings.save_queue is None:
+        app_state.settings.save_queue = Queue()
+        Thread(
+            target=_settings_writer,
+            args=(app_state.settings.path, app_state.settings.save_queue),
+            name="settings_writer",
+            daemon=True,
+        ).start()
+    app_state.settings.save_queue.put(settings_from_state(app_state))
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ProcessPoolExecutor
+from queue import Queue
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
-from threading import Timer
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
+from numpy.typing import NDArray
 from p3_viewer import ColormapID  # type: ignore
 
 from .camera import CamFrame, RecordingReader
@@ -20,20 +26,39 @@ from .constants import (
     DEFAULT_RECORDING_FRAME_PERIOD_MS,
     DEFAULT_ANALYSIS_ENABLED,
 )
-from .models import BatchAnalysisResult, NamedArea
+from .models import BatchAnalysisResult, NamedArea, SettingsData
 from .render import RenderConfig
 
+if TYPE_CHECKING:
+    from .services.analysis_service import DetectedMarks
+
+# (name, x, y, width, height)
+NamedAreaKey = tuple[str, int, int, int, int]
+
+
+# Mouse state of one frame, replaced as a whole by refresh_frame_input
+@dataclass(slots=True, frozen=True)
+class FrameInput:
+    mouse_pos: tuple[float, float] = (0.0, 0.0)
+    image_hovered: bool = False
+    image_origin: tuple[float, float] = (0.0, 0.0)
+
 
 @dataclass(slots=True)
 class UiState:
-    texture_tag: str
-    recording_texture_tag: str
-    image_drawlist_tag: str
-    image_draw_tag: str
-    status_text_tag: str
+    # Items touched every frame use integer tags, which DPG doesn't have to
+    # resolve from a string alias on each call
+    texture_tag: int
+    recording_texture_tag: int
+    image_drawlist_tag: int
+    image_draw_tag: int
+    status_text_tag: int
     timestamp_text_tag: str = "timestamp_text"
     hover_temp_text_tag: str = "hover_temp_text"
     active_tab: str = "recording_tab"
+    # Published by the main loop once per frame, mouse handlers on the DPG
+    # callback thread read it once so all its values come from one frame
+    frame_input: FrameInput = field(default_factory=FrameInput)
 
 
 @dataclass(slots=True)
@@ -57,8 +82,26 @@ class AnalysisState:
     base_y: int | None = None
     enabled: bool = DEFAULT_ANALYSIS_ENABLED
     checkbox_tag: str = "analysis_checkbox"
-    overlay_tags: list[str] = field(default_factory=list)
+    overlay_tag_pool: list[str] = field(default_factory=list)
+    overlay_shown_count: int = 0
     area_mark_counts: dict[str, int] = field(default_factory=dict)
+    # Sum of area_mark_counts, kept up to date by the analysis
+    total_mark_count: int = 0
+    # Live analysis running on the analysis worker, see request_analysis
+    analysis_future: Future[tuple[DetectedMarks, dict[str, int]]] | None = None
+    # Set when the inputs changed while analysis_future was running
+    analysis_stale: bool = False
+    # Set when there was nothing to analyze, the overlays are cleared instead
+    analysis_cleared: bool = False
+    # Report the mark count once the next result is applied, see run_analysis
+    analysis_report_status: bool = False
+    # Guards analysis_future and the flags above
+    analysis_lock: Lock = field(default_factory=Lock)
+    # Caches below are only used by the analysis worker thread
+    # Value channel of the last analyzed frame, keyed by the frame object
+    value_channel_cache: tuple[CamFrame, NDArray[np.uint8]] | None = None
+    # Contours of that frame, keyed by the V threshold they were found with
+    contour_cache: dict[int, Sequence[NDArray[Any]]] = field(default_factory=dict)
     color_tolerance: int = DEFAULT_COLOR_TOLERANCE
     min_area: int = DEFAULT_MIN_AREA
     max_area: int = DEFAULT_MAX_AREA
@@ -67,12 +110,21 @@ class AnalysisState:
     min_area_input_tag: str = "min_area_input"
     max_area_input_tag: str = "max_area_input"
     min_circularity_input_tag: str = "min_circularity_input"
+    # time.monotonic() deadline of a debounced analysis run, if one is pending
+    analysis_due_at: float | None = None
     batch_result: BatchAnalysisResult | None = None
     batch_sampling_rate: int = DEFAULT_BATCH_SAMPLING_RATE
     batch_sampling_input_tag: str = "batch_sampling_input"
+    batch_pool: ProcessPoolExecutor | None = None
+    batch_thread: Thread | None = None
+    # (current, total) progress updates, None once the batch thread is done
+    batch_progress: Queue[tuple[int, int] | None] = field(default_factory=Queue)
     batch_analyze_button_tag: str = "batch_analyze_button"
     batch_chart_window_tag: str = "batch_chart_window"
     batch_plot_tag: str = "batch_plot"
+    # Line series in the batch chart, keyed by named area
+    batch_series_tags: dict[str, int] = field(default_factory=dict)
+    line_themes: list[int] = field(default_factory=list)
     batch_percentile_container_tag: str = "batch_percentile_container"
     batch_percentile_table_tag: str = "batch_percentile_table"
 
@@ -84,8 +136,34 @@ class AreasState:
     drag_start: tuple[float, float] | None = None
     mode_button_tag: str = "mode_button"
     preview_rect_tag: str = "preview_rect"
+    # Owned by the main loop, only flush_preview_rect creates or deletes it
+    preview_rect_created: bool = False
+    # Drag bounds waiting to be drawn, applied once per frame
+    pending_preview_rect: tuple[float, float, float, float] | None = None
+    # Set by clear_preview_rect, the rectangle is removed on the next frame
+    preview_rect_clear_requested: bool = False
+    # Bounds of the area waiting for a name in the area name popup
+    pending_area_bounds: tuple[int, int, int, int] | None = None
+    area_name_popup_tag: str = "area_name_popup"
+    area_name_text_tag: str = "area_name_text"
+    area_name_input_tag: str = "area_name_input"
     areas_list_tag: str = "areas_list"
-    area_overlay_tags: list[str] = field(default_factory=list)
+    # Areas and analysis mode the areas list was last built for
+    areas_list_key: tuple[bool, tuple[NamedAreaKey, ...]] | None = None
+    # "Marks: N" text items in the areas list, one per area when shown
+    areas_list_count_tags: list[int] = field(default_factory=list)
+    # Draw layer holding the area overlays, right above the image
+    area_overlay_layer_tag: str = "area_overlay_layer"
+    # (rectangle, label) draw items per area, reused across redraws
+    area_overlay_tags: list[tuple[str, str]] = field(default_factory=list)
+    # Areas the overlays were last drawn for
+    area_overlay_key: tuple[NamedAreaKey, ...] | None = None
+
+
+@dataclass(slots=True)
+class RecordingRow:
+    group_tag: int
+    selectable_tag: int
 
 
 @dataclass(slots=True)
@@ -101,15 +179,25 @@ class RecordingState:
     selected_theme: int | None = None
     recordings_dir: Path | None = None
     recordings_list_tag: str = "recordings_list"
+    # Directory mtime (ns) and the sorted recordings found at that time
+    recordings_cache: tuple[int, list[Path]] | None = None
+    recordings_empty_tag: str = "recordings_list_empty"
+    recording_rows: dict[Path, RecordingRow] = field(default_factory=dict)
+    # Recording currently styled as selected in the list
+    shown_selected_path: Path | None = None
     drawlist_tag: str = "recording_drawlist"
     draw_tag: str = "recording_draw"
     status_tag: str = "recording_status_text"
+    # Text last shown by update_recording_indicator
+    status_text: str = ""
     camera_status_tag: str = "recording_camera_status_text"
     frame_period_ms: int = DEFAULT_RECORDING_FRAME_PERIOD_MS
     frame_period_input_tag: str = "recording_frame_period_input"
     start_button_tag: str = "recording_start_button"
     pause_button_tag: str = "recording_pause_button"
     stop_button_tag: str = "recording_stop_button"
+    # Start/pause/stop enabled flags last applied by update_recording_buttons
+    buttons_enabled: tuple[bool, bool, bool] | None = None
     rename_modal_tag: str = "rename_recording_modal"
     rename_input_tag: str = "rename_recording_input"
     slider_tag: str = "image_slider"
@@ -118,7 +206,10 @@ class RecordingState:
 @dataclass(slots=True)
 class SettingsState:
     path: Path | None = None
-    save_timer: Timer | None = None
+    # time.monotonic() deadline of a pending settings save
+    save_due_at: float | None = None
+    # Settings snapshots for the background writer, created on first save
+    save_queue: Queue[SettingsData] | None = None
 
 
 @dataclass(slots=True)
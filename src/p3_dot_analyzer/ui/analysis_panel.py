@@ -26,46 +26,70 @@ def show_batch_results_chart(state: AppState) -> None:
     if state.analysis.batch_result is None:
         return
 
-    # Delete existing chart window if it exists
-    if dpg.does_item_exist(state.analysis.batch_chart_window_tag):
-        dpg.delete_item(state.analysis.batch_chart_window_tag)
-
-    with dpg.window(
-        label="Batch Analysis Results",
-        tag=state.analysis.batch_chart_window_tag,
-        width=800,
-        height=500,
-        pos=(200, 100),
-    ):
-        # Create plot
-        with dpg.plot(
-            label="Marks Over Time",
-            height=-1,
-            width=-1,
-            tag=state.analysis.batch_plot_tag,
+    # The window is built once; later runs only update the series data
+    if not dpg.does_item_exist(state.analysis.batch_chart_window_tag):
+        state.analysis.batch_series_tags.clear()
+        with dpg.window(
+            label="Batch Analysis Results",
+            tag=state.analysis.batch_chart_window_tag,
+            width=800,
+            height=500,
+            pos=(200, 100),
         ):
-            # Add legend
-            dpg.add_plot_legend()
-
-            # Add axes
-            dpg.add_plot_axis(dpg.mvXAxis, label="Time (seconds)", tag="x_axis")
-            dpg.add_plot_axis(dpg.mvYAxis, label="Number of Marks", tag="y_axis")
-
-            # Add line series for each named area
-            timestamps = state.analysis.batch_result.timestamps
-            for i, area in enumerate(state.areas.named_areas):
-                area_name = area.name
-                if area_name in state.analysis.batch_result.area_counts:
-                    counts = state.analysis.batch_result.area_counts[area_name]
-                    color = AREA_COLORS_RGB[i % len(AREA_COLORS_RGB)]
-                    dpg.add_line_series(
-                        timestamps,
-                        counts,
-                        label=area_name,
-                        parent="y_axis",
-                    )
-                    # Set series color
-                    dpg.bind_item_theme(dpg.last_item(), create_line_theme(color))
+            # Create plot
+            with dpg.plot(
+                label="Marks Over Time",
+                height=-1,
+                width=-1,
+                tag=state.analysis.batch_plot_tag,
+            ):
+                # Add legend
+                dpg.add_plot_legend()
+
+                # Add axes
+                dpg.add_plot_axis(dpg.mvXAxis, label="Time (seconds)", tag="x_axis")
+                dpg.add_plot_axis(dpg.mvYAxis, label="Number of Marks", tag="y_axis")
+    else:
+        dpg.show_item(state.analysis.batch_chart_window_tag)
+
+    # Update, add or remove one line series per named area
+    result = state.analysis.batch_result
+    timestamps = result.timestamps
+    series_tags = state.analysis.batch_series_tags
+    area_rows = {name: row for row, name in enumerate(result.area_names)}
+    for area_name in list(series_tags):
+        if area_name not in area_rows:
+            dpg.delete_item(series_tags.pop(area_name))
+
+    # One theme per palette color, shared by all series
+    if not state.analysis.line_themes:
+        state.analysis.line_themes = [
+            create_line_theme(color) for color in AREA_COLORS_RGB
+        ]
+    line_themes = state.analysis.line_themes
+
+    for i, area in enumerate(state.areas.named_areas):
+        area_name = area.name
+        row = area_rows.get(area_name)
+        if row is None:
+            continue
+        counts = result.counts[row]
+        series_tag = series_tags.get(area_name)
+        if series_tag is not None:
+            dpg.set_value(series_tag, [timestamps, counts])
+        else:
+            series_tag = dpg.add_line_series(
+                timestamps,
+                counts,
+                label=area_name,
+                parent="y_axis",
+            )
+            series_tags[area_name] = series_tag
+        # Set series color, which follows the area's position in the list
+        dpg.bind_item_theme(series_tag, line_themes[i % len(line_themes)])
+
+    dpg.fit_axis_data("x_axis")
+    dpg.fit_axis_data("y_axis")
 
 
 def build_percentile_table(state: AppState) -> None:
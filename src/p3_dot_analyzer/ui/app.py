@@ -1,16 +1,22 @@
 from __future__ import annotations
 
+import queue
+import threading
+import time
+from collections.abc import Callable
+
 import dearpygui.dearpygui as dpg  # type: ignore
 from p3_viewer import ColormapID  # type: ignore
 
-from ..analysis import run_analysis
+from ..analysis import apply_finished_analysis, request_analysis, run_analysis
+from ..constants import ANALYSIS_DEBOUNCE_S
 from ..camera import RENDER_HEIGHT, RENDER_WIDTH, Camera, CamFrame
 from ..state import AppState
-from ..named_areas import update_areas_list
+from ..named_areas import clear_preview_rect, update_areas_list
 from ..render import render
-from ..services.analysis_service import run_batch_analysis
+from ..services.analysis_service import is_batch_running, run_batch_analysis
 from ..settings_io import schedule_settings_save
-from ..ui_helpers import update_status, render_frame
+from ..ui_helpers import clamp, update_status, render_frame
 from .analysis_panel import (
     build_analysis_controls,
     build_percentile_table,
@@ -19,7 +25,9 @@ from .analysis_panel import (
 )
 from .areas_panel import build_named_areas_controls
 from .events import create_mouse_handlers, make_on_image_loaded_callback
+from .render_panel import build_image_view, build_render_config_controls
 from .recording_panel import (
+    build_playback_controls,
     build_recording_tab,
     open_selected_recording,
     refresh_recordings_list,
@@ -28,16 +36,26 @@ from .recording_panel import (
 )
 
 
-def build_ui(app_state: AppState, camera: Camera) -> None:
-    """Create Dear PyGui windows and widgets."""
+def build_ui(app_state: AppState, camera: Camera) -> Callable[[], None]:
+    """Create Dear PyGui windows and widgets.
+
+    Returns a callback the main loop runs once per iteration to apply work
+    finished off the UI thread.
+    """
 
     def refresh_areas_list(state: AppState) -> None:
         update_areas_list(state, on_areas_changed)
 
     def on_areas_changed(state: AppState) -> None:
-        run_analysis(state, refresh_areas_list)
+        request_analysis(state)
+
+    def schedule_analysis(state: AppState) -> None:
+        """Re-run analysis once settings stop changing, see poll_ui."""
+        state.analysis.analysis_due_at = time.monotonic() + ANALYSIS_DEBOUNCE_S
 
     on_image_loaded = make_on_image_loaded_callback(on_areas_changed)
+    # Render config inputs re-render right away, but analyze once they settle
+    on_image_rerendered = make_on_image_loaded_callback(schedule_analysis)
 
     def on_mode_button_clicked(
         _sender: int, _app_data: None, user_data: AppState
@@ -57,58 +75,54 @@ def build_ui(app_state: AppState, camera: Camera) -> None:
             dpg.configure_item(user_data.areas.mode_button_tag, label="Create Area")
             update_status(user_data, "View mode: click on image to select a base point")
             # Remove preview rectangle if exists
-            if dpg.does_item_exist(user_data.areas.preview_rect_tag):
-                dpg.delete_item(user_data.areas.preview_rect_tag)
+            clear_preview_rect(user_data)
 
     def on_analysis_toggle(_sender: int, app_data: bool) -> None:
         """Handle analysis mode checkbox toggle."""
         app_state.analysis.enabled = app_data
         schedule_settings_save(app_state)
         if app_data:
-            update_status(app_state, "Analysis mode enabled - detecting marks...")
-            on_areas_changed(app_state)
             if app_state.analysis.base_x is None or app_state.analysis.base_y is None:
+                request_analysis(app_state)
                 update_status(
                     app_state,
                     "Analysis mode enabled - click on image to select a base point",
                 )
             else:
-                mark_count = sum(app_state.analysis.area_mark_counts.values())
-                update_status(
-                    app_state,
-                    f"Analysis: found marks, {mark_count} in named areas",
-                )
+                update_status(app_state, "Analysis mode enabled - detecting marks...")
+                # poll_ui reports the mark count once the result is drawn
+                run_analysis(app_state)
         else:
             update_status(app_state, "Analysis mode disabled")
             on_areas_changed(app_state)  # This will clear overlays
 
     def on_tolerance_change(_sender: int, app_data: int) -> None:
         """Handle tolerance input change."""
-        app_state.analysis.color_tolerance = max(1, min(100, int(app_data)))
+        app_state.analysis.color_tolerance = clamp(int(app_data), 1, 100)
         schedule_settings_save(app_state)
-        on_areas_changed(app_state)
+        schedule_analysis(app_state)
 
     def on_min_area_change(_sender: int, app_data: int) -> None:
         """Handle min area input change."""
-        app_state.analysis.min_area = max(10, min(5000, int(app_data)))
+        app_state.analysis.min_area = clamp(int(app_data), 10, 5000)
         schedule_settings_save(app_state)
-        on_areas_changed(app_state)
+        schedule_analysis(app_state)
 
     def on_max_area_change(_sender: int, app_data: int) -> None:
         """Handle max area input change."""
-        app_state.analysis.max_area = max(10, min(5000, int(app_data)))
+        app_state.analysis.max_area = clamp(int(app_data), 10, 5000)
         schedule_settings_save(app_state)
-        on_areas_changed(app_state)
+        schedule_analysis(app_state)
 
     def on_min_circularity_change(_sender: int, app_data: float) -> None:
         """Handle min circularity input change."""
-        app_state.analysis.min_circularity = max(0.0, min(1.0, float(app_data)))
+        app_state.analysis.min_circularity = clamp(float(app_data), 0.0, 1.0)
         schedule_settings_save(app_state)
-        on_areas_changed(app_state)
+        schedule_analysis(app_state)
 
     def on_sampling_rate_change(_sender: int, app_data: int) -> None:
         """Handle sampling rate input change."""
-        app_state.analysis.batch_sampling_rate = max(1, min(100, app_data))
+        app_state.analysis.batch_sampling_rate = clamp(app_data, 1, 100)
         schedule_settings_save(app_state)
 
     def normalize_render_range() -> None:
@@ -141,7 +155,7 @@ def build_ui(app_state: AppState, camera: Camera) -> None:
             app_state.render.current_frame,
             texture_tag=app_state.ui.texture_tag,
             draw_tag=app_state.ui.image_draw_tag,
-            on_image_loaded=on_image_loaded,
+            on_image_loaded=on_image_rerendered,
         )
 
     def apply_render_config() -> None:
@@ -154,7 +168,7 @@ def build_ui(app_state: AppState, camera: Camera) -> None:
             render_recording_frame(
                 app_state,
                 app_state.recording.frame_index,
-                on_image_loaded,
+                on_image_rerendered,
             )
         else:
             rerender_current_frame()
@@ -164,16 +178,12 @@ def build_ui(app_state: AppState, camera: Camera) -> None:
         normalize_render_range()
         schedule_settings_save(app_state)
         apply_render_config()
-        if app_state.analysis.enabled:
-            on_areas_changed(app_state)
 
     def on_render_temp_max_change(_sender: int, app_data: float) -> None:
         app_state.render.temp_max = float(app_data)
         normalize_render_range()
         schedule_settings_save(app_state)
         apply_render_config()
-        if app_state.analysis.enabled:
-            on_areas_changed(app_state)
 
     def on_render_colormap_change(_sender: int, app_data: str) -> None:
         mapping = {colormap.name: colormap for colormap in ColormapID}
@@ -181,15 +191,13 @@ def build_ui(app_state: AppState, camera: Camera) -> None:
             app_state.render.colormap = mapping[app_data]
             schedule_settings_save(app_state)
             apply_render_config()
-            if app_state.analysis.enabled:
-                on_areas_changed(app_state)
 
     def on_render_emissivity_change(_sender: int, app_data: float) -> None:
-        app_state.render.emissivity = max(0.0, min(1.0, float(app_data)))
+        app_state.render.emissivity = clamp(float(app_data), 0.0, 1.0)
         schedule_settings_save(app_state)
 
     def on_render_reflected_temp_change(_sender: int, app_data: float) -> None:
-        app_state.render.reflected_temp = max(-100.0, min(1000.0, float(app_data)))
+        app_state.render.reflected_temp = clamp(float(app_data), -100.0, 1000.0)
         schedule_settings_save(app_state)
 
     def on_recording_frame_change(_sender: int, app_data: int) -> None:
@@ -209,17 +217,35 @@ def build_ui(app_state: AppState, camera: Camera) -> None:
             update_status(app_state, "Please create at least one named area first")
             return
 
+        if is_batch_running(app_state):
+            return
+
         # Disable button during analysis
         dpg.configure_item(app_state.analysis.batch_analyze_button_tag, enabled=False)
         dpg.configure_item(
             app_state.analysis.batch_analyze_button_tag, label="Analyzing..."
         )
 
+        # DPG must only be touched from the UI thread, so the worker just
+        # reports progress through the queue drained by poll_ui
+        progress = app_state.analysis.batch_progress
+
         def progress_callback(current: int, total: int) -> None:
-            update_status(app_state, f"Batch analysis: {current}/{total} images...")
+            progress.put((current, total))
+
+        def worker() -> None:
+            try:
+                run_batch_analysis(app_state, progress_callback=progress_callback)
+            finally:
+                progress.put(None)
+
+        app_state.analysis.batch_thread = threading.Thread(
+            target=worker, name="batch_analysis", daemon=True
+        )
+        app_state.analysis.batch_thread.start()
 
-        # Run batch analysis
-        run_batch_analysis(app_state, progress_callback=progress_callback)
+    def on_batch_analysis_finished() -> None:
+        app_state.analysis.batch_thread = None
 
         # Re-enable button
         dpg.configure_item(app_state.analysis.batch_analyze_button_tag, enabled=True)
@@ -237,6 +263,26 @@ def build_ui(app_state: AppState, camera: Camera) -> None:
         else:
             update_status(app_state, "Batch analysis failed")
 
+    def poll_ui() -> None:
+        """Run pending analysis and apply results from the workers."""
+        apply_finished_analysis(app_state, refresh_areas_list)
+        due_at = app_state.analysis.analysis_due_at
+        if due_at is not None and time.monotonic() >= due_at:
+            app_state.analysis.analysis_due_at = None
+            on_areas_changed(app_state)
+
+        progress = app_state.analysis.batch_progress
+        while True:
+            try:
+                item = progress.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                on_batch_analysis_finished()
+                return
+            current, total = item
+            update_status(app_state, f"Batch analysis: {current}/{total} images...")
+
     def _focused_input_item_type() -> str | None:
         if not hasattr(dpg, "get_focused_item"):
             return None
@@ -266,12 +312,10 @@ def build_ui(app_state: AppState, camera: Camera) -> None:
         else:
             return
 
-        next_index = max(
+        next_index = clamp(
+            app_state.recording.frame_index + delta,
             0,
-            min(
-                app_state.recording.frame_count - 1,
-                app_state.recording.frame_index + delta,
-            ),
+            app_state.recording.frame_count - 1,
         )
         if next_index == app_state.recording.frame_index:
             return
@@ -328,91 +372,20 @@ def build_ui(app_state: AppState, camera: Camera) -> None:
                         with dpg.group(horizontal=True):
                             # Left side: image area
                             with dpg.group():
-                                dpg.add_text("Image")
-                                with dpg.drawlist(
-                                    width=RENDER_WIDTH,
-                                    height=RENDER_HEIGHT,
-                                    tag=app_state.ui.image_drawlist_tag,
-                                ):
-                                    dpg.draw_image(
-                                        app_state.ui.texture_tag,
-                                        pmin=(0, 0),
-                                        pmax=(1, 1),  # updated on render
-                                        tag=app_state.ui.image_draw_tag,
-                                    )
-                                dpg.add_text(
-                                    "Temp: --",
-                                    tag=app_state.ui.hover_temp_text_tag,
+                                build_image_view(app_state)
+                                build_render_config_controls(
+                                    app_state,
+                                    on_render_temp_min_change,
+                                    on_render_temp_max_change,
+                                    on_render_emissivity_change,
+                                    on_render_reflected_temp_change,
                                 )
-                                dpg.add_separator()
-                                dpg.add_text("Render Config")
-                                with dpg.group(horizontal=True):
-                                    dpg.add_input_float(
-                                        label="Temp Min (C)",
-                                        default_value=app_state.render.temp_min,
-                                        callback=on_render_temp_min_change,
-                                        tag=app_state.render.temp_min_input_tag,
-                                        width=120,
-                                        format="%.2f",
-                                    )
-                                    dpg.add_input_float(
-                                        label="Temp Max (C)",
-                                        default_value=app_state.render.temp_max,
-                                        callback=on_render_temp_max_change,
-                                        tag=app_state.render.temp_max_input_tag,
-                                        width=120,
-                                        format="%.2f",
-                                    )
-                                    # We only work with WHITEHOT
-                                    # dpg.add_combo(
-                                    #    label="Colormap",
-                                    #    items=[
-                                    #        colormap.name for colormap in ColormapID
-                                    #    ],
-                                    #    default_value=app_state.render.colormap.name,
-                                    #    callback=on_render_colormap_change,
-                                    #    tag=app_state.render.colormap_combo_tag,
-                                    #    width=160,
-                                    # )
-                                with dpg.group(horizontal=True):
-                                    dpg.add_input_float(
-                                        label="Emissivity",
-                                        default_value=app_state.render.emissivity,
-                                        callback=on_render_emissivity_change,
-                                        tag=app_state.render.emissivity_input_tag,
-                                        width=120,
-                                        format="%.3f",
-                                    )
-                                    dpg.add_input_float(
-                                        label="Reflected (ambient) Temp (C)",
-                                        default_value=app_state.render.reflected_temp,
-                                        callback=on_render_reflected_temp_change,
-                                        tag=app_state.render.reflected_temp_input_tag,
-                                        width=140,
-                                        format="%.2f",
-                                    )
 
                             # Right side: controls
                             with dpg.group():
-                                dpg.add_separator()
-                                dpg.add_text("Playback")
-                                dpg.add_slider_int(
-                                    label="Frame",
-                                    tag=app_state.recording.slider_tag,
-                                    default_value=app_state.recording.frame_index,
-                                    min_value=0,
-                                    max_value=max(
-                                        0, app_state.recording.frame_count - 1
-                                    ),
-                                    callback=on_recording_frame_change,
-                                    width=220,
-                                    enabled=app_state.recording.reader is not None,
+                                build_playback_controls(
+                                    app_state, on_recording_frame_change
                                 )
-                                dpg.add_text(
-                                    "No recording loaded",
-                                    tag=app_state.recording.frame_text_tag,
-                                )
-
                                 build_named_areas_controls(
                                     app_state, on_mode_button_clicked
                                 )
@@ -459,3 +432,5 @@ def build_ui(app_state: AppState, camera: Camera) -> None:
         dpg.add_mouse_release_handler(
             button=dpg.mvMouseButton_Left, callback=handlers.on_mouse_release
         )
+
+    return poll_ui
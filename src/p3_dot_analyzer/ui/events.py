@@ -6,7 +6,11 @@ from collections.abc import Callable
 import dearpygui.dearpygui as dpg  # type: ignore
 
 from ..state import AppState
-from ..named_areas import redraw_area_overlays, show_area_name_popup
+from ..named_areas import (
+    clear_preview_rect,
+    redraw_area_overlays,
+    show_area_name_popup,
+)
 from ..settings_io import schedule_settings_save
 from ..ui_helpers import screen_to_image_coords, get_temp_at, update_status
 
@@ -40,14 +44,13 @@ def create_mouse_handlers(
 
     def on_mouse_click(_sender: int, _app_data: None) -> None:
         # Global mouse click handler for base point picking and area creation
-        if not dpg.is_item_hovered(app_state.ui.image_drawlist_tag):
+        frame_input = app_state.ui.frame_input
+        if not frame_input.image_hovered:
             return
 
-        mouse_x, mouse_y = dpg.get_mouse_pos(local=False)
-
         if app_state.areas.interaction_mode == "view":
             # Base point picker mode - store image coords at click position
-            img_x, img_y = screen_to_image_coords(app_state, mouse_x, mouse_y)
+            img_x, img_y = screen_to_image_coords(app_state, frame_input)
             temp = get_temp_at(app_state, img_x, img_y)
             if temp is not None:
                 app_state.analysis.base_x = img_x
@@ -61,12 +64,12 @@ def create_mouse_handlers(
                 on_analysis_update(app_state)
 
     def on_mouse_move(_sender: int, _app_data: tuple[float, float]) -> None:
-        if not dpg.is_item_hovered(app_state.ui.image_drawlist_tag):
+        frame_input = app_state.ui.frame_input
+        if not frame_input.image_hovered:
             dpg.set_value(app_state.ui.hover_temp_text_tag, "Temp: --")
             return
 
-        mouse_x, mouse_y = dpg.get_mouse_pos(local=False)
-        img_x, img_y = screen_to_image_coords(app_state, mouse_x, mouse_y)
+        img_x, img_y = screen_to_image_coords(app_state, frame_input)
         temp = get_temp_at(app_state, img_x, img_y)
         if temp is None:
             dpg.set_value(app_state.ui.hover_temp_text_tag, "Temp: --")
@@ -77,13 +80,13 @@ def create_mouse_handlers(
         """Handle mouse down for starting area creation drag."""
         if app_state.areas.interaction_mode != "create_area":
             return
-        if not dpg.is_item_hovered(app_state.ui.image_drawlist_tag):
+        frame_input = app_state.ui.frame_input
+        if not frame_input.image_hovered:
             return
         if app_state.areas.drag_start is not None:
             return
 
-        mouse_x, mouse_y = dpg.get_mouse_pos(local=False)
-        local_coords = screen_to_image_coords(app_state, mouse_x, mouse_y)
+        local_coords = screen_to_image_coords(app_state, frame_input)
         app_state.areas.drag_start = local_coords
         update_status(
             app_state, f"Drag started at ({local_coords[0]:.0f}, {local_coords[1]:.0f})"
@@ -96,8 +99,7 @@ def create_mouse_handlers(
         if app_state.areas.drag_start is None:
             return
 
-        mouse_x, mouse_y = dpg.get_mouse_pos(local=False)
-        local_coords = screen_to_image_coords(app_state, mouse_x, mouse_y)
+        local_coords = screen_to_image_coords(app_state, app_state.ui.frame_input)
 
         # Calculate rectangle bounds
         x1, y1 = app_state.areas.drag_start
@@ -107,23 +109,9 @@ def create_mouse_handlers(
         min_x, max_x = min(x1, x2), max(x1, x2)
         min_y, max_y = min(y1, y2), max(y1, y2)
 
-        # Update or create preview rectangle
-        if dpg.does_item_exist(app_state.areas.preview_rect_tag):
-            dpg.configure_item(
-                app_state.areas.preview_rect_tag,
-                pmin=(min_x, min_y),
-                pmax=(max_x, max_y),
-            )
-        else:
-            dpg.draw_rectangle(
-                pmin=(min_x, min_y),
-                pmax=(max_x, max_y),
-                color=(0, 255, 0, 255),
-                fill=(0, 255, 0, 50),
-                thickness=2,
-                tag=app_state.areas.preview_rect_tag,
-                parent=app_state.ui.image_drawlist_tag,
-            )
+        # Mouse drag events can arrive much faster than frames are drawn, so
+        # only remember the bounds; the main loop applies them once per frame
+        app_state.areas.pending_preview_rect = (min_x, min_y, max_x, max_y)
 
     def on_mouse_release(_sender: int, _app_data: None) -> None:
         """Handle mouse release for finalizing area creation."""
@@ -132,8 +120,7 @@ def create_mouse_handlers(
         if app_state.areas.drag_start is None:
             return
 
-        mouse_x, mouse_y = dpg.get_mouse_pos(local=False)
-        local_coords = screen_to_image_coords(app_state, mouse_x, mouse_y)
+        local_coords = screen_to_image_coords(app_state, app_state.ui.frame_input)
 
         # Calculate rectangle bounds
         x1, y1 = app_state.areas.drag_start
@@ -149,8 +136,7 @@ def create_mouse_handlers(
         # Only create area if it has some size
         if width < 5 or height < 5:
             app_state.areas.drag_start = None
-            if dpg.does_item_exist(app_state.areas.preview_rect_tag):
-                dpg.delete_item(app_state.areas.preview_rect_tag)
+            clear_preview_rect(app_state)
             update_status(app_state, "Area too small, cancelled")
             return
 
@@ -158,8 +144,7 @@ def create_mouse_handlers(
         pending_area_bounds = (int(min_x), int(min_y), int(width), int(height))
 
         # Remove preview rectangle
-        if dpg.does_item_exist(app_state.areas.preview_rect_tag):
-            dpg.delete_item(app_state.areas.preview_rect_tag)
+        clear_preview_rect(app_state)
 
         # Show name input popup
         show_area_name_popup(app_state, pending_area_bounds, on_analysis_update)
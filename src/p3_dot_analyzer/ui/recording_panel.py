@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 import os
@@ -15,9 +16,10 @@ from ..camera import (
     RecordingReader,
     CamEvRecordingStats,
 )
-from ..state import AppState
+from ..services.analysis_service import is_batch_running, shutdown_batch_pool
+from ..state import AppState, RecordingRow
 from ..settings_io import schedule_settings_save
-from ..ui_helpers import render_frame, update_status
+from ..ui_helpers import clamp, render_frame, update_status
 
 
 def format_duration(duration: timedelta) -> str:
@@ -29,15 +31,15 @@ def format_duration(duration: timedelta) -> str:
     return f"{minutes:02d}:{seconds:02d}"
 
 
+_BYTE_UNITS = ("B", "KB", "MB", "GB")
+
+
 def format_bytes(size_bytes: int) -> str:
-    size = float(size_bytes)
-    for unit in ("B", "KB", "MB", "GB"):
-        if size < 1024.0 or unit == "GB":
-            if unit == "B":
-                return f"{int(size)} {unit}"
-            return f"{size:.1f} {unit}"
-        size /= 1024.0
-    return f"{int(size_bytes)} B"
+    # Every unit step is 10 bits
+    unit = min(len(_BYTE_UNITS) - 1, max(0, (size_bytes.bit_length() - 1) // 10))
+    if unit == 0:
+        return f"{size_bytes} B"
+    return f"{size_bytes / (1 << (10 * unit)):.1f} {_BYTE_UNITS[unit]}"
 
 
 def update_recording_indicator(
@@ -49,6 +51,9 @@ def update_recording_indicator(
         duration_text = format_duration(stats.duration)
         size_text = format_bytes(stats.file_size_bytes)
         text = f"{status_label} | {duration_text} | {stats.frame_count} frames | {size_text}"
+    if text == state.recording.status_text:
+        return
+    state.recording.status_text = text
     dpg.set_value(state.recording.status_tag, text)
 
 
@@ -58,9 +63,17 @@ def update_recording_buttons(state: AppState) -> None:
     )
     pause_enabled = state.recording.active
     stop_enabled = state.recording.active
-    dpg.configure_item(state.recording.start_button_tag, enabled=start_enabled)
-    dpg.configure_item(state.recording.pause_button_tag, enabled=pause_enabled)
-    dpg.configure_item(state.recording.stop_button_tag, enabled=stop_enabled)
+    enabled = (start_enabled, pause_enabled, stop_enabled)
+    shown = state.recording.buttons_enabled
+    tags = (
+        state.recording.start_button_tag,
+        state.recording.pause_button_tag,
+        state.recording.stop_button_tag,
+    )
+    for i, tag in enumerate(tags):
+        if shown is None or shown[i] != enabled[i]:
+            dpg.configure_item(tag, enabled=enabled[i])
+    state.recording.buttons_enabled = enabled
 
 
 def update_recording_frame_text(state: AppState) -> None:
@@ -86,7 +99,7 @@ def render_recording_frame(
         return
     if state.recording.frame_count <= 0:
         return
-    index = max(0, min(state.recording.frame_count - 1, index))
+    index = clamp(index, 0, state.recording.frame_count - 1)
     state.recording.frame_index = index
     if dpg.does_item_exist(state.recording.slider_tag):
         dpg.set_value(state.recording.slider_tag, index)
@@ -169,92 +182,186 @@ def get_recordings_dir(state: AppState) -> Path:
 
 def list_recordings(state: AppState) -> list[Path]:
     recordings_dir = get_recordings_dir(state)
-    if not recordings_dir.exists():
+    try:
+        mtime_ns = recordings_dir.stat().st_mtime_ns
+    except OSError:
+        return []
+    # Adding, removing or renaming a file updates the directory mtime
+    cache = state.recording.recordings_cache
+    if cache is not None and cache[0] == mtime_ns:
+        return cache[1]
+    try:
+        with os.scandir(recordings_dir) as entries:
+            names = [
+                entry.name
+                for entry in entries
+                if entry.name.lower().endswith(".p3dat") and entry.is_file()
+            ]
+    except OSError:
         return []
-    return sorted(recordings_dir.glob("*.p3dat"), key=lambda p: p.name.lower())
+    names.sort(key=str.lower)
+    recordings = [recordings_dir / name for name in names]
+    state.recording.recordings_cache = (mtime_ns, recordings)
+    return recordings
 
 
 def refresh_recordings_list(
     state: AppState, on_image_loaded: Callable[[AppState], None] | None = None
 ) -> None:
+    """Sync the recordings list with the directory and the selection.
+
+    Rows are kept between refreshes; only rows of added or removed recordings
+    are created or deleted, and only a changed selection is restyled.
+    """
     if not dpg.does_item_exist(state.recording.recordings_list_tag):
         return
-    dpg.delete_item(state.recording.recordings_list_tag, children_only=True)
     recordings = list_recordings(state)
+    rows = state.recording.recording_rows
+
+    for rec_path in rows.keys() - set(recordings):
+        dpg.delete_item(rows.pop(rec_path).group_tag)
+        if state.recording.shown_selected_path == rec_path:
+            state.recording.shown_selected_path = None
+
+    empty_tag = state.recording.recordings_empty_tag
     if not recordings:
-        dpg.add_text("No recordings found", parent=state.recording.recordings_list_tag)
+        if not dpg.does_item_exist(empty_tag):
+            dpg.add_text(
+                "No recordings found",
+                tag=empty_tag,
+                parent=state.recording.recordings_list_tag,
+            )
         return
-    for rec_path in recordings:
-        is_selected = state.recording.selected_recording_path == rec_path
-
-        def on_select(_sender: int, app_data: bool, user_data: Path) -> None:
-            if not app_data:
-                return
-            state.recording.selected_recording_path = user_data
-            state.recording.frame_index = 0
-            schedule_settings_save(state)
-            update_status(state, f"Selected recording: {user_data.name}")
-            open_selected_recording(state, on_image_loaded)
-            refresh_recordings_list(state, on_image_loaded)
-
-        with dpg.group(horizontal=True, parent=state.recording.recordings_list_tag):
-            dpg.add_selectable(
-                label=f"▶ {rec_path.name}" if is_selected else rec_path.name,
-                default_value=is_selected,
-                callback=on_select,
-                user_data=rec_path,
-                width=210,
+    if dpg.does_item_exist(empty_tag):
+        dpg.delete_item(empty_tag)
+
+    # Walk backwards so a new row can be inserted before its successor
+    next_group_tag = 0
+    for rec_path in reversed(recordings):
+        row = rows.get(rec_path)
+        if row is None:
+            row = _add_recording_row(state, rec_path, next_group_tag, on_image_loaded)
+            rows[rec_path] = row
+        next_group_tag = row.group_tag
+
+    selected_path = state.recording.selected_recording_path
+    if selected_path not in rows:
+        selected_path = None
+    if selected_path != state.recording.shown_selected_path:
+        if state.recording.shown_selected_path is not None:
+            _style_recording_row(
+                state, state.recording.shown_selected_path, selected=False
             )
-            if is_selected and state.recording.selected_theme is not None:
-                dpg.bind_item_theme(dpg.last_item(), state.recording.selected_theme)
-
-            def on_rename_clicked(
-                _sender: int, _app_data: None, user_data: Path
-            ) -> None:
-                if (
-                    state.recording.active
-                    and state.recording.current_recording_path == user_data
-                ):
-                    update_status(state, "Cannot rename the active recording.")
-                    return
-                show_rename_modal(state, user_data, on_image_loaded)
-
-            def on_delete_clicked(
-                _sender: int, _app_data: None, user_data: Path
-            ) -> None:
-                if (
-                    state.recording.active
-                    and state.recording.current_recording_path == user_data
-                ):
-                    update_status(state, "Cannot delete the active recording.")
-                    return
-                try:
-                    if user_data.exists():
-                        user_data.unlink()
-                    if state.recording.selected_recording_path == user_data:
-                        state.recording.selected_recording_path = None
-                        close_recording_reader(state)
-                        schedule_settings_save(state)
-                    update_status(state, f"Deleted recording: {user_data.name}")
-                except OSError as exc:
-                    update_status(
-                        state,
-                        f"Failed to delete recording: {user_data.name} ({exc})",
-                    )
-                refresh_recordings_list(state, on_image_loaded)
+        if selected_path is not None:
+            _style_recording_row(state, selected_path, selected=True)
+        state.recording.shown_selected_path = selected_path
+
+
+def _style_recording_row(state: AppState, rec_path: Path, selected: bool) -> None:
+    selectable_tag = state.recording.recording_rows[rec_path].selectable_tag
+    dpg.configure_item(
+        selectable_tag,
+        label=f"▶ {rec_path.name}" if selected else rec_path.name,
+    )
+    dpg.set_value(selectable_tag, selected)
+    theme = state.recording.selected_theme if selected else None
+    dpg.bind_item_theme(selectable_tag, theme or 0)
 
-            dpg.add_button(
-                label="Rename",
-                callback=on_rename_clicked,
-                user_data=rec_path,
-                width=60,
-            )
-            dpg.add_button(
-                label="Delete",
-                callback=on_delete_clicked,
-                user_data=rec_path,
-                width=55,
-            )
+
+@dataclass(slots=True, frozen=True)
+class _RowContext:
+    """user_data shared by the widgets of one recordings list row."""
+
+    state: AppState
+    rec_path: Path
+    on_image_loaded: Callable[[AppState], None] | None
+
+
+def _on_recording_select(sender: int, app_data: bool, ctx: _RowContext) -> None:
+    state = ctx.state
+    if not app_data:
+        # Clicking the selected recording again keeps it selected
+        dpg.set_value(sender, True)
+        return
+    state.recording.selected_recording_path = ctx.rec_path
+    state.recording.frame_index = 0
+    schedule_settings_save(state)
+    update_status(state, f"Selected recording: {ctx.rec_path.name}")
+    open_selected_recording(state, ctx.on_image_loaded)
+    refresh_recordings_list(state, ctx.on_image_loaded)
+
+
+def _on_recording_rename(_sender: int, _app_data: None, ctx: _RowContext) -> None:
+    state = ctx.state
+    if (
+        state.recording.active
+        and state.recording.current_recording_path == ctx.rec_path
+    ):
+        update_status(state, "Cannot rename the active recording.")
+        return
+    if is_batch_running(state):
+        update_status(state, "Cannot rename recordings during batch analysis.")
+        return
+    show_rename_modal(state, ctx.rec_path, ctx.on_image_loaded)
+
+
+def _on_recording_delete(_sender: int, _app_data: None, ctx: _RowContext) -> None:
+    state = ctx.state
+    rec_path = ctx.rec_path
+    if state.recording.active and state.recording.current_recording_path == rec_path:
+        update_status(state, "Cannot delete the active recording.")
+        return
+    if is_batch_running(state):
+        update_status(state, "Cannot delete recordings during batch analysis.")
+        return
+    # Batch workers keep the recording mapped
+    shutdown_batch_pool(state)
+    try:
+        if rec_path.exists():
+            rec_path.unlink()
+            state.recording.recordings_cache = None
+        if state.recording.selected_recording_path == rec_path:
+            state.recording.selected_recording_path = None
+            close_recording_reader(state)
+            schedule_settings_save(state)
+        update_status(state, f"Deleted recording: {rec_path.name}")
+    except OSError as exc:
+        update_status(
+            state,
+            f"Failed to delete recording: {rec_path.name} ({exc})",
+        )
+    refresh_recordings_list(state, ctx.on_image_loaded)
+
+
+def _add_recording_row(
+    state: AppState,
+    rec_path: Path,
+    before: int,
+    on_image_loaded: Callable[[AppState], None] | None,
+) -> RecordingRow:
+    ctx = _RowContext(state, rec_path, on_image_loaded)
+    with dpg.group(
+        horizontal=True, parent=state.recording.recordings_list_tag, before=before
+    ) as group_tag:
+        selectable_tag = dpg.add_selectable(
+            label=rec_path.name,
+            callback=_on_recording_select,
+            user_data=ctx,
+            width=210,
+        )
+        dpg.add_button(
+            label="Rename",
+            callback=_on_recording_rename,
+            user_data=ctx,
+            width=60,
+        )
+        dpg.add_button(
+            label="Delete",
+            callback=_on_recording_delete,
+            user_data=ctx,
+            width=55,
+        )
+    return RecordingRow(group_tag=group_tag, selectable_tag=selectable_tag)
 
 
 def show_rename_modal(
@@ -278,8 +385,13 @@ def show_rename_modal(
         if new_path.exists():
             update_status(state, "A recording with that name already exists.")
             return
+        if is_batch_running(state):
+            update_status(state, "Cannot rename recordings during batch analysis.")
+            return
+        shutdown_batch_pool(state)
         try:
             target_path.rename(new_path)
+            state.recording.recordings_cache = None
             if state.recording.selected_recording_path == target_path:
                 state.recording.selected_recording_path = new_path
                 schedule_settings_save(state)
@@ -316,6 +428,27 @@ def show_rename_modal(
             dpg.add_button(label="Cancel", callback=on_cancel)
 
 
+def build_playback_controls(
+    state: AppState, on_frame_change: Callable[[int, int], None]
+) -> None:
+    dpg.add_separator()
+    dpg.add_text("Playback")
+    dpg.add_slider_int(
+        label="Frame",
+        tag=state.recording.slider_tag,
+        default_value=state.recording.frame_index,
+        min_value=0,
+        max_value=max(0, state.recording.frame_count - 1),
+        callback=on_frame_change,
+        width=220,
+        enabled=state.recording.reader is not None,
+    )
+    dpg.add_text(
+        "No recording loaded",
+        tag=state.recording.frame_text_tag,
+    )
+
+
 def build_recording_tab(
     state: AppState,
     camera: Camera,
@@ -348,7 +481,7 @@ def build_recording_tab(
                 min_clamped=True,
                 max_clamped=True,
                 callback=lambda _s, v: setattr(
-                    state.recording, "frame_period_ms", max(1, min(10000, int(v)))
+                    state.recording, "frame_period_ms", clamp(int(v), 1, 10000)
                 ),
                 tag=state.recording.frame_period_input_tag,
                 width=140,
@@ -374,6 +507,7 @@ def build_recording_tab(
                 except ValueError as exc:
                     update_status(state, f"Recording start failed: {exc}")
                     return
+                state.recording.recordings_cache = None
                 state.recording.current_recording_path = recording_path
                 state.recording.active = True
                 state.recording.paused = False
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import dearpygui.dearpygui as dpg  # type: ignore
+
+from ..camera import RENDER_HEIGHT, RENDER_WIDTH
+from ..state import AppState
+
+
+def build_image_view(state: AppState) -> None:
+    dpg.add_text("Image")
+    with dpg.drawlist(
+        width=RENDER_WIDTH,
+        height=RENDER_HEIGHT,
+        tag=state.ui.image_drawlist_tag,
+    ):
+        dpg.draw_image(
+            state.ui.texture_tag,
+            pmin=(0, 0),
+            pmax=(1, 1),  # updated on render
+            tag=state.ui.image_draw_tag,
+        )
+        # Keeps named areas below the analysis marks and the preview rectangle
+        dpg.add_draw_layer(tag=state.areas.area_overlay_layer_tag)
+    dpg.add_text(
+        "Temp: --",
+        tag=state.ui.hover_temp_text_tag,
+    )
+
+
+def build_render_config_controls(
+    state: AppState,
+    on_temp_min_change: Callable[[int, float], None],
+    on_temp_max_change: Callable[[int, float], None],
+    on_emissivity_change: Callable[[int, float], None],
+    on_reflected_temp_change: Callable[[int, float], None],
+) -> None:
+    dpg.add_separator()
+    dpg.add_text("Render Config")
+    with dpg.group(horizontal=True):
+        dpg.add_input_float(
+            label="Temp Min (C)",
+            default_value=state.render.temp_min,
+            callback=on_temp_min_change,
+            tag=state.render.temp_min_input_tag,
+            width=120,
+            format="%.2f",
+        )
+        dpg.add_input_float(
+            label="Temp Max (C)",
+            default_value=state.render.temp_max,
+            callback=on_temp_max_change,
+            tag=state.render.temp_max_input_tag,
+            width=120,
+            format="%.2f",
+        )
+        # We only work with WHITEHOT
+        # dpg.add_combo(
+        #    label="Colormap",
+        #    items=[
+        #        colormap.name for colormap in ColormapID
+        #    ],
+        #    default_value=state.render.colormap.name,
+        #    callback=on_render_colormap_change,
+        #    tag=state.render.colormap_combo_tag,
+        #    width=160,
+        # )
+    with dpg.group(horizontal=True):
+        dpg.add_input_float(
+            label="Emissivity",
+            default_value=state.render.emissivity,
+            callback=on_emissivity_change,
+            tag=state.render.emissivity_input_tag,
+            width=120,
+            format="%.3f",
+        )
+        dpg.add_input_float(
+            label="Reflected (ambient) Temp (C)",
+            default_value=state.render.reflected_temp,
+            callback=on_reflected_temp_change,
+            tag=state.render.reflected_temp_input_tag,
+            width=140,
+            format="%.2f",
+        )
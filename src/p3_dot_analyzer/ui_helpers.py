@@ -4,11 +4,12 @@ from collections.abc import Callable
 
 import dearpygui.dearpygui as dpg  # type: ignore
 
-from .camera import CamFrame, RENDER_SCALE
-from .state import AppState
-from datetime import datetime
+from .camera import CamFrame
 
-from p3_camera import EnvParams, raw_to_celsius_corrected  # type: ignore[import-untyped]
+# Re-exported for the UI modules
+from .services.frame_utils import clamp as clamp, get_frame_temp as get_frame_temp
+from .state import AppState, FrameInput
+from datetime import datetime
 
 
 def update_status(app_state: AppState, message: str) -> None:
@@ -21,22 +22,37 @@ def update_recording_camera_status(app_state: AppState, message: str) -> None:
     dpg.set_value(app_state.recording.camera_status_tag, message)
 
 
+def refresh_frame_input(app_state: AppState) -> None:
+    """Read the mouse state shared by all input handlers of the next frame."""
+    mouse_x, mouse_y = dpg.get_mouse_pos(local=False)
+    hovered = bool(dpg.is_item_hovered(app_state.ui.image_drawlist_tag))
+    # Image coordinates are only needed over the image or while dragging
+    origin = app_state.ui.frame_input.image_origin
+    if hovered or app_state.areas.drag_start is not None:
+        origin_x, origin_y = dpg.get_item_rect_min(app_state.ui.image_drawlist_tag)
+        origin = (origin_x, origin_y)
+    # Publish with a single store, so handlers never see a mix of two frames
+    app_state.ui.frame_input = FrameInput(
+        mouse_pos=(mouse_x, mouse_y), image_hovered=hovered, image_origin=origin
+    )
+
+
 def screen_to_image_coords(
-    app_state: AppState, screen_x: float, screen_y: float
+    app_state: AppState, frame_input: FrameInput
 ) -> tuple[int, int]:
-    """Convert screen coordinates to image pixel coordinates.
+    """Convert the mouse position of a frame to image pixel coordinates.
 
     Returns clamped coordinates if outside the image bounds.
     """
     if app_state.render.current_frame is None:
         return (0, 0)
 
-    # Get drawlist screen position
-    dl_pos = dpg.get_item_rect_min(app_state.ui.image_drawlist_tag)
-
-    # Convert to local drawlist coords
-    local_x = screen_x - dl_pos[0]
-    local_y = screen_y - dl_pos[1]
+    # Convert to local drawlist coords, using the drawlist screen position
+    # of the same frame
+    screen_x, screen_y = frame_input.mouse_pos
+    origin_x, origin_y = frame_input.image_origin
+    local_x = screen_x - origin_x
+    local_y = screen_y - origin_y
 
     # Bounds check against current image dimensions
     if local_x < 0 or local_y < 0:
@@ -65,32 +81,20 @@ def get_temp_at_img(
     app_state: AppState, frame: CamFrame, img_x: int, img_y: int
 ) -> float | None:
     """Get the temperature at the given image coordinates."""
-    # Bounds check
-    h = frame.height
-    w = frame.width
-    if img_x < 0 or img_x >= w or img_y < 0 or img_y >= h:
-        return None
-
-    img_y = img_y // RENDER_SCALE
-    img_x = img_x // RENDER_SCALE
-
-    env = EnvParams(
-        emissivity=app_state.render.emissivity,
-        reflected_temp=app_state.render.reflected_temp,
-    )
-    return float(
-        raw_to_celsius_corrected(
-            float(frame.raw_thermal[img_y, img_x]),
-            env,
-        )
+    return get_frame_temp(
+        frame,
+        img_x,
+        img_y,
+        app_state.render.emissivity,
+        app_state.render.reflected_temp,
     )
 
 
 def render_frame(
     app_state: AppState,
     frame: CamFrame,
-    texture_tag: str,
-    draw_tag: str,
+    texture_tag: int,
+    draw_tag: int | str,
     update_timestamp: bool = True,
     on_image_loaded: Callable[[AppState], None] | None = None,
 ) -> None: